@@ -3,18 +3,46 @@
 Flask API for managing multiple AI agent deployments with UUID tracking
 """
 
+import io
 import os
-import json
+import mmap
+import functools
+import itertools
 import uuid
+import selectors
+import queue
+import atexit
+import tempfile
 import threading
 import time
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template
+import orjson
+from flask import Flask, Response, request, jsonify, render_template
+from flask.json.provider import JSONProvider
 from pathlib import Path
+from sortedcontainers import SortedKeyList
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+class OrjsonProvider(JSONProvider):
+    """Serve jsonify responses through orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype="application/json",
+        )
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Ensure results and logs directories exist
 RESULTS_DIR = Path("results")
@@ -22,55 +50,373 @@ LOGS_DIR = Path("logs")
 RESULTS_DIR.mkdir(exist_ok=True)
 LOGS_DIR.mkdir(exist_ok=True)
 
+# In-memory task index, populated once from RESULTS_DIR at startup and kept in
+# sync by save_task so request handlers never have to scan the directory
+_TASKS = {}
+_TASK_MTIMES = {}
+_TASKS_LOCK = threading.RLock()
+
+# One sorted view of _TASKS per supported /status sort key. Task dicts held
+# in the index are never mutated in place; updates swap in a new dict. The
+# task id breaks ties, so discarding a task with a common key (a status, or
+# no completed_at yet) is a bisect rather than a scan over every equal key
+SORT_KEYS = ["created_at", "started_at", "completed_at", "status"]
+_SORTED = {
+    key: SortedKeyList(key=lambda t, key=key: (str(t.get(key) or ''), str(t.get('id') or '')))
+    for key in SORT_KEYS
+}
+
+# Task ids whose in-memory state has not been written to disk yet; a
+# background flusher collapses several updates to one task into one write
+_DIRTY = set()
+FLUSH_INTERVAL = 0.2  # seconds
+
+# Threads used to read task files when building the index at startup
+INDEX_LOAD_WORKERS = 16
+
+ACTIVE_STATUSES = ["queued", "deploying"]
+
+# Size of each read from a deployment's stdout pipe
+PIPE_READ_SIZE = 65536
+
+# Deployment output is batched and written to the log with one writev once
+# this many bytes are pending or the oldest pending chunk is this old
+LOG_FLUSH_BYTES = 4096
+LOG_FLUSH_INTERVAL = 0.05  # seconds
+
+# Block size used when reading log files backwards for /logs tails
+LOG_TAIL_CHUNK = 65536
+
+# /scrapers listing, rebuilt only when the scrapers directory mtime changes
+SCRAPERS_DIR = Path("scripts/scrapers")
+_SCRAPERS_CACHE = {"mtime": None, "data": None}
+_SCRAPERS_LOCK = threading.Lock()
+
+# Only the first lines of a scraper module are checked for a description
+SCRAPER_HEADER_LINES = 10
+
+# Working directory and interpreter/script prefix shared by every deployment
+CWD = os.getcwd()
+_CMD_PREFIX = (sys.executable, str(Path(__file__).resolve().parent / "deploy_ai_agent.py"))
+
+# Deployments are queued and started by a single supervisor thread, which
+# runs at most AGENT_WORKERS at once; /launch answers 503 once the queue is full
+JOB_QUEUE_SIZE = 256
+AGENT_WORKERS = int(os.environ.get("AGENT_WORKERS", os.cpu_count() or 4))
+JOB_Q = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+
+# Last formatted timestamp as [time_ns, iso_string], reused for up to 1 ms
+_NOW_CACHE = [0, ""]
+
+def _now_iso():
+    """Current local time in ISO format, formatted at most once per millisecond"""
+    now_ns = time.time_ns()
+    cached_ns, cached_iso = _NOW_CACHE
+    if now_ns - cached_ns > 1_000_000:
+        cached_iso = datetime.fromtimestamp(now_ns / 1e9).isoformat()
+        _NOW_CACHE[:] = [now_ns, cached_iso]
+    return cached_iso
+
 def get_task_file(task_id):
-    """Get the path to a task's JSON file"""
-    return RESULTS_DIR / f"{task_id}.json"
+    """Get the path to a task's JSON file, sharded by the first two id chars"""
+    return RESULTS_DIR / task_id[:2] / f"{task_id}.json"
 
-def load_task(task_id):
-    """Load task from its JSON file"""
-    task_file = get_task_file(task_id)
-    if task_file.exists():
+def _migrate_flat_task_files():
+    """Move task files from the old flat results/ layout into their shards"""
+    with os.scandir(RESULTS_DIR) as entries:
+        flat_files = [e.path for e in entries if e.name.endswith(".json") and e.is_file()]
+    for path in flat_files:
+        task_file = Path(path)
+        target = get_task_file(task_file.stem)
         try:
-            with open(task_file, 'r') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return None
+            target.parent.mkdir(exist_ok=True)
+            os.replace(task_file, target)
+        except OSError as e:
+            print(f"⚠️  Could not move {task_file} to {target}: {e}")
 
-def save_task(task_id, task_data):
-    """Save task to its JSON file"""
+def _read_task_file(task_file):
+    """Read a task JSON file, returning (task_data, mtime_ns) or (None, None)"""
+    try:
+        with open(task_file, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if st.st_size == 0:
+                # mmap cannot map an empty file (e.g. one caught mid-write)
+                return None, None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                task_data = orjson.loads(view)
+        mtime_ns = st.st_mtime_ns
+        if isinstance(task_data, dict):
+            return task_data, mtime_ns
+    except Exception:
+        pass
+    return None, None
+
+def _set_task(task_id, task_data):
+    """Store a task in the index and its sorted views (caller holds the lock)"""
+    old = _TASKS.get(task_id)
+    for sorted_tasks in _SORTED.values():
+        if old is not None:
+            sorted_tasks.discard(old)
+        sorted_tasks.add(task_data)
+    _TASKS[task_id] = task_data
+
+def _scan_task_files():
+    """List (task_id, path) for every task file in the shard directories"""
+    task_files = []
+    with os.scandir(RESULTS_DIR) as shards:
+        shard_paths = [e.path for e in shards if e.is_dir()]
+    for shard_path in shard_paths:
+        with os.scandir(shard_path) as entries:
+            for e in entries:
+                if e.name.endswith(".json") and e.is_file():
+                    task_files.append((e.name[:-5], e.path))
+    return task_files
+
+def _load_task_index():
+    """Populate the in-memory task index with a single scan of RESULTS_DIR"""
+    _migrate_flat_task_files()
+    task_files = _scan_task_files()
+    # open/read release the GIL, so the many small reads overlap
+    with ThreadPoolExecutor(max_workers=INDEX_LOAD_WORKERS) as pool:
+        loaded = pool.map(_read_task_file, [path for _, path in task_files])
+        with _TASKS_LOCK:
+            for (task_id, _), (task_data, mtime_ns) in zip(task_files, loaded):
+                if task_data is not None:
+                    _set_task(task_id, task_data)
+                    _TASK_MTIMES[task_id] = mtime_ns
+
+def _refresh_active_tasks():
+    """Pick up changes written to active task files by deploy_ai_agent.py.
+
+    The deployment subprocess adds fields such as browser_hotlink and
+    automation_result directly to the task file, so active tasks are
+    re-read whenever their mtime changes. Finished tasks are never rescanned.
+    """
+    with _TASKS_LOCK:
+        active_ids = [tid for tid, t in _TASKS.items() if t.get("status") in ACTIVE_STATUSES]
+    for task_id in active_ids:
+        _refresh_task(task_id)
+
+def _refresh_task(task_id):
+    """Re-read a task file if it changed on disk since we last saw it"""
     task_file = get_task_file(task_id)
     try:
-        with open(task_file, 'w') as f:
-            json.dump(task_data, f, indent=2)
-        return True
+        mtime_ns = task_file.stat().st_mtime_ns
+    except OSError:
+        return
+    with _TASKS_LOCK:
+        # Unflushed in-memory state is newer than whatever is on disk
+        if task_id in _DIRTY or _TASK_MTIMES.get(task_id) == mtime_ns:
+            return
+        task_data, mtime_ns = _read_task_file(task_file)
+        if task_data is not None:
+            _set_task(task_id, task_data)
+            _TASK_MTIMES[task_id] = mtime_ns
+
+def load_task(task_id):
+    """Load task from the in-memory index"""
+    _refresh_task(task_id)
+    with _TASKS_LOCK:
+        task = _TASKS.get(task_id)
+        return dict(task) if task is not None else None
+
+def save_task(task_id, task_data):
+    """Save task to the in-memory index and queue it for writing to disk"""
+    with _TASKS_LOCK:
+        _set_task(task_id, dict(task_data))
+        _DIRTY.add(task_id)
+    return True
+
+def _write_task_file(task_file, task_data):
+    """Atomically replace a task's JSON file"""
+    task_file.parent.mkdir(exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=task_file.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(task_data))
+        os.replace(tmp_path, task_file)
     except Exception:
-        return False
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def flush_tasks():
+    """Write every dirty task to its JSON file"""
+    with _TASKS_LOCK:
+        pending = {tid: dict(_TASKS[tid]) for tid in _DIRTY if tid in _TASKS}
+        _DIRTY.clear()
+    
+    for task_id, task_data in pending.items():
+        task_file = get_task_file(task_id)
+        try:
+            _write_task_file(task_file, task_data)
+            mtime_ns = task_file.stat().st_mtime_ns
+        except Exception as e:
+            print(f"⚠️  Could not write task {task_id}: {e}")
+            with _TASKS_LOCK:
+                _DIRTY.add(task_id)
+            continue
+        with _TASKS_LOCK:
+            _TASK_MTIMES[task_id] = mtime_ns
+
+def _flush_loop():
+    """Background thread that periodically flushes dirty tasks"""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush_tasks()
 
 def update_task_status(task_id, status, **kwargs):
     """Update task status and save to file"""
-    task = load_task(task_id)
-    if task:
-        task["status"] = status
-        if status == "deploying" and "started_at" not in task:
-            task["started_at"] = datetime.now().isoformat()
-        elif status in ["completed", "failed"] and "completed_at" not in task:
-            task["completed_at"] = datetime.now().isoformat()
-        
-        # Add any additional fields
-        task.update(kwargs)
-        save_task(task_id, task)
+    with _TASKS_LOCK:
+        task = load_task(task_id)
+        if task:
+            task["status"] = status
+            # /launch stores both timestamps as None until they happen
+            if status == "deploying" and not task.get("started_at"):
+                task["started_at"] = _now_iso()
+            elif status in ["completed", "failed", "cancelled"] and not task.get("completed_at"):
+                task["completed_at"] = _now_iso()
+            
+            # Add any additional fields
+            task.update(kwargs)
+            save_task(task_id, task)
 
-def run_agent_deployment(task_id, prompt, scraper=None):
-    """Run AI agent deployment in a separate thread"""
-    try:
-        update_task_status(task_id, "deploying")
+_load_task_index()
+threading.Thread(target=_flush_loop, name="task-flusher", daemon=True).start()
+atexit.register(flush_tasks)
+
+class DeploymentSupervisor(threading.Thread):
+    """Single thread that starts queued deployments and pumps all their output"""
+
+    def __init__(self, max_running):
+        super().__init__(name="agent-supervisor", daemon=True)
+        self.max_running = max_running
+        self.running = 0
+        self.exiting = []
+        # Running jobs by task id, and ids /cancel asked the supervisor to stop
+        self.jobs = {}
+        self.cancelled = set()
+        self.cancel_lock = threading.Lock()
+        self.sel = selectors.DefaultSelector()
+        # Self-pipe so /launch can interrupt select() when it queues a job
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.sel.register(self.wake_r, selectors.EVENT_READ, data=None)
+
+    def wake(self):
+        """Ask the supervisor to look at JOB_Q now"""
+        try:
+            os.write(self.wake_w, b"\0")
+        except OSError:
+            pass
+
+    def cancel(self, task_id):
+        """Ask the supervisor to terminate a running deployment"""
+        with self.cancel_lock:
+            self.cancelled.add(task_id)
+        self.wake()
+
+    def run(self):
+        while True:
+            try:
+                self._step()
+            except Exception as e:
+                # Errors tied to one job fail just that job inside each step;
+                # this only keeps the supervisor alive through anything else
+                print(f"⚠️  Deployment supervisor error: {e}")
+                time.sleep(0.5)
+
+    def _step(self):
+        """One pass: cancel, start, pump output, flush logs and reap"""
+        self._terminate_cancelled()
+        self._start_queued()
+        timeout = LOG_FLUSH_INTERVAL if any(job["pending"] for job in self.jobs.values()) else 0.5
+        for key, _ in self.sel.select(timeout=timeout):
+            if key.data is None:
+                try:
+                    os.read(self.wake_r, 4096)
+                except OSError:
+                    pass
+                continue
+            try:
+                self._pump(key.fd, key.data)
+            except Exception as e:
+                self._fail(key.data, e)
+        self._flush_stale_logs()
+        self._reap()
+
+    def _fail(self, job, error):
+        """Fail a single job after an unexpected error"""
+        # A job that already finished has given up its slot
+        if self.jobs.get(job["task_id"]) is not job:
+            return
+        try:
+            self._close(job)
+        except Exception as e:
+            print(f"⚠️  Could not close output of task {job['task_id']}: {e}")
+        if job in self.exiting:
+            self.exiting.remove(job)
+        try:
+            self._finish(job, error=str(error))
+        except Exception as e:
+            print(f"⚠️  Could not record failure of task {job['task_id']}: {e}")
+
+    def _terminate_cancelled(self):
+        """Send SIGTERM to running deployments that were cancelled"""
+        with self.cancel_lock:
+            pending = [tid for tid in self.cancelled if tid in self.jobs]
+        for task_id in pending:
+            job = self.jobs[task_id]
+            try:
+                process = job["process"]
+                if process is not None and process.poll() is None and not job.get("terminated"):
+                    print(f"🛑 Cancelling task {task_id}")
+                    process.terminate()
+                    job["terminated"] = True
+            except Exception as e:
+                self._fail(job, e)
+
+    def _start_queued(self):
+        """Start queued deployments while below the concurrency limit"""
+        while self.running < self.max_running:
+            try:
+                task_id, prompt, scraper = JOB_Q.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                with _TASKS_LOCK:
+                    # Tasks cancelled while still queued are dropped here
+                    task = _TASKS.get(task_id)
+                    if task is None or task.get("status") != "queued":
+                        JOB_Q.task_done()
+                        continue
+                    update_task_status(task_id, "deploying")
+            except Exception as e:
+                print(f"❌ Could not start task {task_id}: {e}")
+                JOB_Q.task_done()
+                continue
+            self.running += 1
+            job = {"task_id": task_id, "prefix": f"[{task_id[:8]}] ", "partial": b"",
+                   "log_fd": None, "pending": [], "pending_size": 0, "pending_since": 0.0,
+                   "process": None}
+            self.jobs[task_id] = job
+            try:
+                self._start(job, prompt, scraper)
+            except Exception as e:
+                self._fail(job, e)
+
+    def _start(self, job, prompt, scraper):
+        """Spawn deploy_ai_agent.py for a task and register its output pipe"""
+        task_id = job["task_id"]
         
         # Create log file for this task in logs directory
         log_file = LOGS_DIR / f"{task_id}.txt"
         
         # Build command with task_id
-        cmd = [sys.executable, "deploy_ai_agent.py", "--task", prompt, "--task-id", task_id]
+        cmd = [*_CMD_PREFIX, "--task", prompt, "--task-id", task_id]
         if scraper:
             cmd.extend(["--scraper", scraper])
         
@@ -78,42 +424,133 @@ def run_agent_deployment(task_id, prompt, scraper=None):
         print(f"📝 Logs will be written to: {log_file}")
         print(f"🔧 Command: {' '.join(cmd)}")
         
-        # Run the deployment with real-time output capture
-        with open(log_file, 'w') as log:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,  # Combine stderr with stdout
-                text=True,
-                bufsize=1,  # Line buffered
-                universal_newlines=True,
-                cwd=os.getcwd()
-            )
-            
-            # Stream output to both console and file in real-time
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    line_clean = line.rstrip()
-                    # Print to console with task ID prefix
-                    print(f"[{task_id[:8]}] {line_clean}")
-                    # Write to log file
-                    log.write(line)
-                    log.flush()
-            
-            # Wait for process to complete
-            return_code = process.wait()
+        job["log_fd"] = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        job["process"] = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,  # Combine stderr with stdout
+            cwd=CWD
+        )
+        fd = job["process"].stdout.fileno()
+        os.set_blocking(fd, False)
+        self.sel.register(fd, selectors.EVENT_READ, data=job)
+
+    def _pump(self, fd, job):
+        """Copy whatever output is available to the log file and console"""
+        try:
+            chunk = os.read(fd, PIPE_READ_SIZE)
+        except BlockingIOError:
+            return
+        if not chunk:
+            # EOF: stop watching the pipe and wait for the process to exit
+            self._close(job)
+            self.exiting.append(job)
+            return
         
-        # Update final status based on return code
-        if return_code == 0:
-            update_task_status(task_id, "completed", return_code=return_code)
-            print(f"✅ Task {task_id} completed successfully")
-        else:
-            update_task_status(task_id, "failed", return_code=return_code)
-            print(f"❌ Task {task_id} failed with return code {return_code}")
-    
-    except Exception as e:
-        update_task_status(task_id, "failed", error=str(e))
-        print(f"❌ Task {task_id} failed with exception: {e}")
+        # Queue for the log file; written in batches by _flush_log
+        if not job["pending"]:
+            job["pending_since"] = time.monotonic()
+        job["pending"].append(chunk)
+        job["pending_size"] += len(chunk)
+        if job["pending_size"] >= LOG_FLUSH_BYTES:
+            self._flush_log(job)
+        # Print complete lines to console with task ID prefix
+        data = job["partial"] + chunk
+        last_nl = data.rfind(b"\n")
+        if last_nl == -1:
+            job["partial"] = data
+            return
+        job["partial"] = data[last_nl + 1:]
+        lines = data[:last_nl].decode(errors="replace").split("\n")
+        print("\n".join(job["prefix"] + line.rstrip() for line in lines))
+
+    def _flush_log(self, job):
+        """Write a job's pending output to its log with a single writev"""
+        pending = job["pending"]
+        if not pending or job["log_fd"] is None:
+            return
+        written = os.writev(job["log_fd"], pending)
+        if written < job["pending_size"]:
+            rest = b"".join(pending)[written:]
+            while rest:
+                rest = rest[os.write(job["log_fd"], rest):]
+        pending.clear()
+        job["pending_size"] = 0
+
+    def _flush_stale_logs(self):
+        """Flush pending log output that has waited LOG_FLUSH_INTERVAL"""
+        now = time.monotonic()
+        for job in list(self.jobs.values()):
+            if job["pending"] and now - job["pending_since"] >= LOG_FLUSH_INTERVAL:
+                try:
+                    self._flush_log(job)
+                except Exception as e:
+                    self._fail(job, e)
+
+    def _close(self, job):
+        """Unregister and close a job's pipe and log file"""
+        process = job["process"]
+        if process is not None and process.stdout is not None and not process.stdout.closed:
+            try:
+                self.sel.unregister(process.stdout.fileno())
+            except (KeyError, ValueError):
+                pass
+            process.stdout.close()
+        if job["partial"]:
+            print(job["prefix"] + job["partial"].decode(errors="replace").rstrip())
+            job["partial"] = b""
+        if job["log_fd"] is not None:
+            try:
+                self._flush_log(job)
+            finally:
+                os.close(job["log_fd"])
+                job["log_fd"] = None
+
+    def _reap(self):
+        """Record the final status of deployments whose process has exited"""
+        exiting, self.exiting = self.exiting, []
+        for job in exiting:
+            try:
+                return_code = job["process"].poll()
+            except Exception as e:
+                self._fail(job, e)
+                continue
+            if return_code is None:
+                self.exiting.append(job)
+                continue
+            try:
+                self._finish(job, return_code=return_code)
+            except Exception as e:
+                # _finish has already freed the slot
+                print(f"⚠️  Could not record result of task {job['task_id']}: {e}")
+
+    def _finish(self, job, return_code=None, error=None):
+        """Update final status and free the job's slot"""
+        task_id = job["task_id"]
+        with self.cancel_lock:
+            self.cancelled.discard(task_id)
+        try:
+            if job.get("terminated"):
+                update_task_status(task_id, "cancelled", return_code=return_code)
+                print(f"🛑 Task {task_id} cancelled")
+            elif error is not None:
+                if job["process"] is not None and job["process"].poll() is None:
+                    job["process"].kill()
+                update_task_status(task_id, "failed", error=error)
+                print(f"❌ Task {task_id} failed with exception: {error}")
+            elif return_code == 0:
+                update_task_status(task_id, "completed", return_code=return_code)
+                print(f"✅ Task {task_id} completed successfully")
+            else:
+                update_task_status(task_id, "failed", return_code=return_code)
+                print(f"❌ Task {task_id} failed with return code {return_code}")
+        finally:
+            self.jobs.pop(task_id, None)
+            self.running -= 1
+            JOB_Q.task_done()
+
+SUPERVISOR = DeploymentSupervisor(AGENT_WORKERS)
+SUPERVISOR.start()
 
 @app.route('/launch', methods=['POST'])
 def launch_agent():
@@ -135,7 +572,7 @@ def launch_agent():
         "prompt": prompt,
         "scraper": scraper,
         "status": "queued",
-        "created_at": datetime.now().isoformat(),
+        "created_at": _now_iso(),
         "started_at": None,
         "completed_at": None
     }
@@ -143,13 +580,17 @@ def launch_agent():
     # Save initial task to file
     save_task(task_id, task_data)
     
-    # Start deployment in separate thread
-    thread = threading.Thread(
-        target=run_agent_deployment,
-        args=(task_id, prompt, scraper),
-        daemon=True
-    )
-    thread.start()
+    # Hand the deployment to the supervisor
+    try:
+        JOB_Q.put_nowait((task_id, prompt, scraper))
+        SUPERVISOR.wake()
+    except queue.Full:
+        update_task_status(task_id, "failed", error="Deployment queue is full")
+        return jsonify({
+            "task_id": task_id,
+            "status": "failed",
+            "error": "Deployment queue is full, try again later"
+        }), 503
     
     return jsonify({
         "task_id": task_id,
@@ -157,6 +598,29 @@ def launch_agent():
         "message": "AI agent deployment started"
     }), 202
 
+@app.route('/cancel/<task_id>', methods=['POST'])
+def cancel_task(task_id):
+    """Cancel a queued or running deployment"""
+    with _TASKS_LOCK:
+        task = load_task(task_id)
+        if not task:
+            return jsonify({"error": "Task not found"}), 404
+        
+        status = task.get("status")
+        if status == "queued":
+            # The supervisor skips it when it reaches the front of the queue
+            update_task_status(task_id, "cancelled")
+        elif status == "deploying":
+            SUPERVISOR.cancel(task_id)
+        else:
+            return jsonify({"task_id": task_id, "status": status, "error": "Task already finished"}), 409
+    
+    return jsonify({
+        "task_id": task_id,
+        "status": "cancelled" if status == "queued" else "cancelling",
+        "message": "Cancellation requested"
+    }), 202
+
 @app.route('/status/<task_id>', methods=['GET'])
 def get_task_status(task_id):
     """Get the status of a specific task"""
@@ -165,8 +629,23 @@ def get_task_status(task_id):
     if not task:
         return jsonify({"error": "Task not found"}), 404
     
+    # Task files are stored compact; indent only when a human asks for it
+    if request.args.get('pretty') == '1':
+        return Response(orjson.dumps(task, option=orjson.OPT_INDENT_2), mimetype='application/json')
+    
     return jsonify(task)
 
+@functools.lru_cache(maxsize=64)
+def _task_filter(status_filter, scraper_filter):
+    """Build the /status predicate for one filter combination"""
+    if status_filter and scraper_filter:
+        return lambda t: t.get('status') == status_filter and t.get('scraper') == scraper_filter
+    if status_filter:
+        return lambda t: t.get('status') == status_filter
+    if scraper_filter:
+        return lambda t: t.get('scraper') == scraper_filter
+    return lambda t: True
+
 @app.route('/status', methods=['GET'])
 def get_all_tasks():
     """Get the status of all tasks with pagination, filtering, and sorting"""
@@ -178,43 +657,44 @@ def get_all_tasks():
     sort_by = request.args.get('sort', 'created_at')  # created_at, status, completed_at
     sort_order = request.args.get('order', 'desc')  # asc, desc
     
-    tasks = []
-    
-    # Scan results directory for all task files
-    for task_file in RESULTS_DIR.glob("*.json"):
-        try:
-            with open(task_file, 'r') as f:
-                task_data = json.load(f)
-                tasks.append(task_data)
-        except Exception:
-            continue
-    
-    # Apply filters
-    if status_filter:
-        tasks = [t for t in tasks if t.get('status') == status_filter]
-    
-    if scraper_filter:
-        tasks = [t for t in tasks if t.get('scraper') == scraper_filter]
-    
-    # Sort tasks
+    # Walk the pre-sorted view for the requested key; tasks with equal values
+    # come out in task id order (reversed for desc), since pages are
+    # positional slices of the view
     reverse = sort_order == 'desc'
-    try:
-        if sort_by in ['created_at', 'started_at', 'completed_at']:
-            tasks.sort(key=lambda x: x.get(sort_by) or '', reverse=reverse)
-        elif sort_by == 'status':
-            tasks.sort(key=lambda x: x.get('status', ''), reverse=reverse)
-        else:
-            # Default sort by created_at desc (newest first)
-            tasks.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    except Exception:
-        # Fallback to default sort
-        tasks.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    if sort_by not in SORT_KEYS:
+        # Default sort by created_at desc (newest first)
+        sort_by, reverse = 'created_at', True
     
-    # Pagination
-    total = len(tasks)
     start = (page - 1) * per_page
     end = start + per_page
-    paginated_tasks = tasks[start:end]
+    
+    _refresh_active_tasks()
+    with _TASKS_LOCK:
+        sorted_tasks = _SORTED[sort_by]
+        total = len(sorted_tasks)
+        if not status_filter and not scraper_filter and start >= 0:
+            # Unfiltered pages are a positional slice of the sorted view
+            if reverse:
+                paginated_tasks = sorted_tasks[max(total - end, 0):max(total - start, 0)][::-1]
+            else:
+                paginated_tasks = sorted_tasks[start:end]
+        else:
+            ordered = reversed(sorted_tasks) if reverse else sorted_tasks
+            matches = _task_filter(status_filter, scraper_filter)
+            if start < 0:
+                # Pages before the first keep plain list-slice semantics
+                tasks = [t for t in ordered if matches(t)]
+                total = len(tasks)
+                paginated_tasks = tasks[start:end]
+            else:
+                # One pass that counts every match but only keeps this page
+                total = 0
+                paginated_tasks = []
+                for t in ordered:
+                    if matches(t):
+                        if start <= total < end:
+                            paginated_tasks.append(t)
+                        total += 1
     
     # Calculate pagination info
     total_pages = (total + per_page - 1) // per_page
@@ -254,19 +734,11 @@ def get_task_results(task_id):
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    # Count active tasks by scanning files
-    active_count = 0
-    total_count = 0
-    
-    for task_file in RESULTS_DIR.glob("*.json"):
-        try:
-            with open(task_file, 'r') as f:
-                task_data = json.load(f)
-                total_count += 1
-                if task_data.get("status") in ["queued", "deploying"]:
-                    active_count += 1
-        except Exception:
-            continue
+    # Count active tasks from the in-memory index
+    _refresh_active_tasks()
+    with _TASKS_LOCK:
+        total_count = len(_TASKS)
+        active_count = sum(1 for t in _TASKS.values() if t.get("status") in ACTIVE_STATUSES)
     
     return jsonify({
         "status": "healthy",
@@ -274,45 +746,89 @@ def health_check():
         "total_tasks": total_count
     })
 
+def _scraper_description(scraper_file):
+    """First docstring line or comment in a scraper's header, without reading the whole file"""
+    with open(scraper_file, 'r') as f:
+        for line in itertools.islice(f, SCRAPER_HEADER_LINES):
+            if '"""' in line or "'''" in line:
+                return line.replace('"""', '').replace("'''", '').strip()
+            elif line.strip().startswith('#') and len(line.strip()) > 5:
+                return line.strip()[1:].strip()
+    return None
+
+def _list_scrapers(scrapers_dir):
+    """Scan the scrapers directory and describe each scraper module"""
+    scrapers = []
+    
+    if scrapers_dir.exists():
+        with os.scandir(scrapers_dir) as entries:
+            scraper_files = [e.path for e in entries
+                             if e.name.endswith(".py") and e.name != "__init__.py" and e.is_file()]
+        for scraper_file in scraper_files:
+            scraper_name = os.path.basename(scraper_file)[:-3]
+            
+            # Look for a docstring or comment with a description in the file header
+            description = None
+            try:
+                description = _scraper_description(scraper_file)
+            except Exception:
+                pass
+            
+            scrapers.append({
+                "name": scraper_name,
+                "description": description or f"{scraper_name} scraper",
+                "file": scraper_file
+            })
+    
+    return scrapers
+
 @app.route('/scrapers', methods=['GET'])
 def get_available_scrapers():
     """Get list of available scrapers"""
-    scrapers_dir = Path("scripts/scrapers")
-    scrapers = []
+    try:
+        mtime = SCRAPERS_DIR.stat().st_mtime_ns
+    except OSError:
+        mtime = None
     
-    if scrapers_dir.exists():
-        for scraper_file in scrapers_dir.glob("*.py"):
-            if scraper_file.name != "__init__.py":
-                scraper_name = scraper_file.stem
-                
-                # Try to read the scraper file to get description
-                description = None
-                try:
-                    with open(scraper_file, 'r') as f:
-                        content = f.read()
-                        # Look for docstring or comments with description
-                        lines = content.split('\n')
-                        for line in lines[:10]:  # Check first 10 lines
-                            if '"""' in line or "'''" in line:
-                                description = line.replace('"""', '').replace("'''", '').strip()
-                                break
-                            elif line.strip().startswith('#') and len(line.strip()) > 5:
-                                description = line.strip()[1:].strip()
-                                break
-                except Exception:
-                    pass
-                
-                scrapers.append({
-                    "name": scraper_name,
-                    "description": description or f"{scraper_name} scraper",
-                    "file": str(scraper_file)
-                })
+    with _SCRAPERS_LOCK:
+        if _SCRAPERS_CACHE["data"] is None or _SCRAPERS_CACHE["mtime"] != mtime:
+            _SCRAPERS_CACHE["data"] = _list_scrapers(SCRAPERS_DIR)
+            _SCRAPERS_CACHE["mtime"] = mtime
+        scrapers = _SCRAPERS_CACHE["data"]
     
     return jsonify({
         "scrapers": scrapers,
         "total": len(scrapers)
     })
 
+def read_log_tail(log_file, tail):
+    """Return the last `tail` lines of a log file as bytes.
+
+    Reads backwards in LOG_TAIL_CHUNK blocks until enough newlines have been
+    seen, so only the requested tail is loaded instead of the whole file.
+    Lines end at \n, \r\n or \r, as in a text-mode read.
+    """
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        # One extra newline guarantees the first returned line is complete
+        while pos > 0 and buf.count(b"\n") + buf.count(b"\r") - buf.count(b"\r\n") <= tail:
+            step = min(LOG_TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return b"".join(buf.splitlines(keepends=True)[-tail:])
+
+def _stream_log(log_file, tail):
+    """Yield a log file (or its tail) in chunks for streaming responses"""
+    if tail > 0:
+        yield read_log_tail(log_file, tail)
+        return
+    with open(log_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(LOG_TAIL_CHUNK), b""):
+            yield chunk
+
 @app.route('/logs/<task_id>', methods=['GET'])
 def get_task_logs(task_id):
     """Get logs for a specific task"""
@@ -322,15 +838,20 @@ def get_task_logs(task_id):
         return jsonify({"error": "Log file not found"}), 404
     
     try:
-        # Get tail parameter (default last 100 lines)
+        # Get tail parameter (default last 100 lines, 0 for the whole file)
         tail = int(request.args.get('tail', 100))
         
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            
-        # Return last N lines
+        # ?raw=1 streams plain text instead of building a JSON payload
+        if request.args.get('raw'):
+            return Response(_stream_log(log_file, tail), mimetype='text/plain')
+        
         if tail > 0:
-            lines = lines[-tail:]
+            content = read_log_tail(log_file, tail)
+        else:
+            with open(log_file, 'rb') as f:
+                content = f.read()
+        # Universal newlines, like the text-mode read this endpoint used to do
+        lines = io.StringIO(content.decode(errors='replace'), newline=None).readlines()
             
         return jsonify({
             "task_id": task_id,
@@ -352,12 +873,17 @@ if __name__ == "__main__":
     print("🌐 API Endpoints:")
     print("   GET  /             - Dashboard (Web UI)")
     print("   POST /launch       - Launch new AI agent")
+    print("   POST /cancel/<id>  - Cancel a queued or running task")
     print("   GET  /status       - Get all tasks (paginated, filtered, sorted)")
-    print("   GET  /status/<id>  - Get specific task status")
+    print("   GET  /status/<id>  - Get specific task status (?pretty=1 to indent)")
     print("   GET  /results/<id> - Get task results")
     print("   GET  /scrapers     - Get available scrapers")
     print("   GET  /health       - Health check")
     print("")
     print("🌐 Open http://localhost:5000 in your browser to access the dashboard")
     
-    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
\ No newline at end of file
+    # The task index, job queue and flusher live in this process, so keep to
+    # a single process: the debug reloader would fork a second copy of them.
+    # For production use: gunicorn -w 1 -k gthread --threads 8 app:app
+    debug = os.environ.get("FLASK_DEBUG", "0") == "1"
+    app.run(host='0.0.0.0', port=5000, debug=debug, threaded=True)
\ No newline at end of file
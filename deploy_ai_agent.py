@@ -3,16 +3,18 @@
 Deploy EC2 instance with Docker, execute browser automation, get result, then cleanup
 """
 
-import boto3
 import json
+import math
 import time
-import subprocess
 import sys
 import os
 import random
-import base64
+import re
+import codecs
+import functools
+import orjson
+import threading
 from dotenv import load_dotenv
-from botocore.exceptions import ClientError
 
 # Load environment variables
 load_dotenv()
@@ -21,50 +23,252 @@ load_dotenv()
 REGION = os.environ.get("AWS_REGION", "us-east-1")
 INSTANCE_NAME = f"ai-executor-{random.randint(1000, 9999)}"
 REPOSITORY_NAME = "ai-executor-ec2"
-INSTANCE_TYPE = "t3.medium"  # Enough power for browser automation
+SECURITY_GROUP_NAME = "ai-executor-sg"  # shared by every run, so later runs can reuse it
+INSTANCE_TYPE = os.environ.get("INSTANCE_TYPE", "t3.medium")  # Enough power for browser automation
+# Browser-use live view link printed by the agent on the instance
+HOTLINK_RE = re.compile(r'https://cloud\.browser-use\.com/hotlink\?user_code=[A-Z0-9]+')
+# Objects below this size go up in one PutObject; larger ones in 8 MiB parts,
+# 20 at a time
+S3_SINGLE_PUT_LIMIT = 16 * 1024 * 1024
+S3_TRANSFER_OPTIONS = dict(
+    multipart_threshold=S3_SINGLE_PUT_LIMIT,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=20,
+    use_threads=True
+)
+RESULT_POLL_MIN_DELAY = 5  # seconds between result checks, doubling per check
+RESULT_POLL_MAX_DELAY = 60  # up to this cap while the task is running
+RESULT_POLL_IMMINENT_DELAY = 2  # once the log shows the result being written
+MONITOR_POLL_DELAY = 30  # seconds between instance polls during the expected work window
+MONITOR_POLL_SLOW_DELAY = 300  # once a task has run past MONITOR_SLOW_AFTER
+MONITOR_SLOW_AFTER = 7200
+MONITOR_ERROR_MAX_DELAY = 300  # cap on the monitor's backoff after failed polls
+CONSOLE_TAIL_CHARS = 8192  # enough of the console buffer for its last 30 lines
+# Log lines printed right before the result upload; "Task completed" is not
+# one, since the agent logs it before the scraper runs
+RESULT_MARKERS = ("Saving result to file", "Uploading result")
+BUILD_POLL_MIN_DELAY = 2  # seconds between CodeBuild status polls, growing
+BUILD_POLL_MAX_DELAY = 20  # by 1.5x per poll up to this cap
+BUILD_EVENT_MAX_WAIT = 300  # seconds between status re-checks on build events while Live Tail runs
+LIVE_TAIL_DRAIN_DELAY = 3  # seconds to let Live Tail deliver a failed build's last lines
+ECR_BATCH_DELETE_SIZE = 100  # API limit for batch_delete_image
+IAM_PROPAGATION_RETRIES = 4  # backing off 1s, 2s, 4s, 8s for a new role to be usable
+# botocore Config options; keep pooled HTTPS connections alive across the
+# monitor's sleeps, with enough of them for 20 concurrent upload parts plus
+# the other thread pools sharing a client
+CLIENT_OPTIONS = dict(tcp_keepalive=True, max_pool_connections=50,
+                      retries={'max_attempts': 10, 'mode': 'adaptive'})
+STS_OPTIONS = dict(connect_timeout=2, read_timeout=5, retries={'max_attempts': 1})
+RESULTS_S3_OPTIONS = dict(connect_timeout=2, read_timeout=5, retries={'max_attempts': 5, 'mode': 'adaptive'})
+RESULT_HEDGE_DELAY = 1  # seconds before a slow result GET gets a duplicate request
+RUNTIME_FILES = ('ec2-image/Dockerfile', 'ec2-image/requirements.txt')  # Define the image tag
+
+def get_task_file(task_id):
+    """Path of a task's JSON file, sharded like app.py by the first two id chars"""
+    return os.path.join("results", task_id[:2], f"{task_id}.json")
+
+def update_task_file(task_id, create=False, **fields):
+    """Merge fields into a task's JSON file and atomically replace it.
+
+    Returns False without writing when the file is missing and create is False.
+    """
+    task_file = get_task_file(task_id)
+    try:
+        with open(task_file, 'rb') as f:
+            task_data = orjson.loads(f.read())
+    except FileNotFoundError:
+        if not create:
+            return False
+        task_data = {}
+    
+    task_data.update(fields)
+    
+    tmp_path = os.path.join(os.path.dirname(task_file), f".{task_id}.{os.getpid()}.tmp")
+    try:
+        f = open(tmp_path, 'wb')
+    except FileNotFoundError:
+        # First file in this shard: create the directory only when it's missing
+        os.makedirs(os.path.dirname(task_file), exist_ok=True)
+        f = open(tmp_path, 'wb')
+    with f:
+        f.write(orjson.dumps(task_data))
+    os.replace(tmp_path, task_file)
+    return True
 
 def get_runtime_hash():
     """Generate hash of runtime environment (Dockerfile + requirements) for versioning"""
     import hashlib
     
-    hash_content = ""
+    # 4-byte digest keeps the 8-char tag
+    h = hashlib.blake2b(digest_size=4)
+    
+    # Only hash the runtime environment files, not the automation code. They
+    # are a few KB, so one read each beats setting up an mmap
+    for path in RUNTIME_FILES:
+        with open(path, 'rb') as f:
+            h.update(f.read())
     
-    # Only hash the runtime environment files, not the automation code
-    with open('ec2-image/Dockerfile', 'rb') as f:
-        hash_content += f.read().decode()
+    return h.hexdigest()
+
+# Runtime hashes are cached across runs, keyed on the files' stat signature
+RUNTIME_HASH_CACHE = os.path.expanduser("~/.cache/ai-executor/runtime_hash.json")
+_IMAGE_TAG = None
+_RUNTIME_CACHE = {}
+
+def _load_runtime_cache():
+    """Read the runtime hash cache, or {} if missing or unreadable"""
+    try:
+        with open(RUNTIME_HASH_CACHE, 'r') as f:
+            cached = json.load(f)
+        return cached if isinstance(cached, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_runtime_cache(cached):
+    """Atomically write the runtime hash cache, ignoring failures"""
+    try:
+        os.makedirs(os.path.dirname(RUNTIME_HASH_CACHE), exist_ok=True)
+        tmp_path = f"{RUNTIME_HASH_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, RUNTIME_HASH_CACHE)
+    except OSError:
+        pass
+
+def get_image_tag():
+    """Image tag for the current runtime - same runtime = same tag"""
+    global _IMAGE_TAG, _RUNTIME_CACHE
+    if _IMAGE_TAG is not None:
+        return _IMAGE_TAG
     
-    with open('ec2-image/requirements.txt', 'rb') as f:
-        hash_content += f.read().decode()
+    key = [[path, st.st_mtime_ns, st.st_size] for path, st in
+           ((path, os.stat(path)) for path in RUNTIME_FILES)]
+    cached = _load_runtime_cache()
+    if cached.get("key") != key or not cached.get("hash"):
+        # Runtime files changed: rehash, and forget the old image digest
+        cached = {"key": key, "hash": get_runtime_hash()}
+        _save_runtime_cache(cached)
     
-    return hashlib.md5(hash_content.encode()).hexdigest()[:8]
+    _RUNTIME_CACHE = cached
+    _IMAGE_TAG = f"runtime-{cached['hash']}"
+    return _IMAGE_TAG
 
-# Use runtime hash for image versioning - same runtime = same tag
-IMAGE_TAG = f"runtime-{get_runtime_hash()}"
+def remember_image_digest(digest):
+    """Record the ECR digest of the current runtime image in the cache"""
+    get_image_tag()
+    if digest and _RUNTIME_CACHE.get("digest") != digest:
+        _RUNTIME_CACHE["digest"] = digest
+        _save_runtime_cache(_RUNTIME_CACHE)
 
-def check_aws_credentials():
-    """Verify AWS credentials are set"""
-    access_key = os.environ.get('AWS_ACCESS_KEY_ID')
-    secret_key = os.environ.get('AWS_SECRET_ACCESS_KEY')
+_CLIENTS_LOCK = threading.Lock()
+# One session for every client, so credentials and endpoint data resolve once
+_SESSION = None
+
+def _new_client(service, **options):
+    """Build a client from the shared session; call with _CLIENTS_LOCK held"""
+    global _SESSION
+    # boto3 and botocore take ~150ms to import, so only pay for them once a
+    # client is actually needed
+    if _SESSION is None:
+        import boto3
+        _SESSION = boto3.session.Session(region_name=REGION)
+    from botocore.config import Config
+    return _SESSION.client(service, config=Config(**{**CLIENT_OPTIONS, **options}))
+
+@functools.lru_cache(maxsize=None)
+def _create_client(service):
+    """Build a boto3 client for the configured region"""
+    return _new_client(service)
+
+def get_client(service):
+    """Shared boto3 client for a service, created once per run"""
+    # A boto3 session is not safe to build clients from concurrently
+    with _CLIENTS_LOCK:
+        return _create_client(service)
+
+@functools.lru_cache(maxsize=1)
+def get_results_client():
+    """S3 client for result objects: short timeouts, retried quickly instead of hanging"""
+    with _CLIENTS_LOCK:
+        return _new_client('s3', **RESULTS_S3_OPTIONS)
+
+@functools.lru_cache(maxsize=1)
+def get_account_id():
+    """AWS account id of the current credentials, looked up once per run"""
+    # Short timeouts and no retries so bad credentials or no network fail fast
+    with _CLIENTS_LOCK:
+        sts = _new_client('sts', **STS_OPTIONS)
+    return sts.get_caller_identity()['Account']
+
+@functools.lru_cache(maxsize=1)
+def _s3_transfer_config():
+    """TransferConfig for multipart uploads, built on first use"""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(**S3_TRANSFER_OPTIONS)
+
+def upload_buffer_to_s3(s3, buffer, bucket, key):
+    """Upload an in-memory BytesIO, skipping the multipart machinery for small ones"""
+    if buffer.getbuffer().nbytes < S3_SINGLE_PUT_LIMIT:
+        s3.put_object(Bucket=bucket, Key=key, Body=buffer.getvalue())
+    else:
+        buffer.seek(0)
+        s3.upload_fileobj(buffer, bucket, key, Config=_s3_transfer_config())
+
+def read_body(response):
+    """Read an S3 object body into a single buffer pre-sized from ContentLength"""
+    body = response['Body']
+    size = response.get('ContentLength')
+    if not size:
+        return body.read()
     
-    if not access_key or not secret_key:
-        print("❌ AWS credentials not found. Please set AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY")
-        print("   You can add them to your .env file")
+    buf = bytearray(size)
+    view = memoryview(buf)
+    pos = 0
+    while pos < size:
+        n = body.readinto(view[pos:])
+        if not n:
+            break
+        pos += n
+    return buf if pos == size else bytes(view[:pos])
+
+def check_aws_credentials():
+    """Verify AWS credentials resolve and are accepted, failing fast if not"""
+    # One short STS round-trip covers env vars, profiles, SSO and instance
+    # roles alike, and primes the cached account id for later calls
+    try:
+        account_id = get_account_id()
+    except Exception as e:
+        print(f"❌ AWS credentials invalid or not found: {e}")
+        print("   You can add AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY to your .env file")
         sys.exit(1)
     
-    print("✅ AWS credentials found")
+    print(f"✅ AWS credentials valid (account {account_id})")
 
 def build_docker_image_if_needed():
     """Build Docker image only if it doesn't exist"""
     print("🔍 Checking if Docker image exists...")
     
     try:
-        ecr = boto3.client('ecr', region_name=REGION)
-        images = ecr.list_images(repositoryName=REPOSITORY_NAME)
-        
-        for image in images.get('imageIds', []):
-            if image.get('imageTag') == IMAGE_TAG:
-                print(f"✅ Docker image {IMAGE_TAG} already exists - skipping build")
+        ecr = get_client('ecr')
+        image_tag = get_image_tag()
+        # Targeted lookup instead of listing the repository: by the digest
+        # recorded for this runtime when known, otherwise by tag
+        digest = _RUNTIME_CACHE.get("digest")
+        image_ids = [{'imageTag': image_tag}]
+        if digest:
+            image_ids.insert(0, {'imageDigest': digest})
+        for image_id in image_ids:
+            try:
+                response = ecr.describe_images(repositoryName=REPOSITORY_NAME, imageIds=[image_id])
+            except ecr.exceptions.ImageNotFoundException:
+                continue
+            details = response.get('imageDetails', [])
+            if details and image_tag in details[0].get('imageTags', []):
+                remember_image_digest(details[0].get('imageDigest'))
+                print(f"✅ Docker image {image_tag} already exists - skipping build")
                 return
+    except ecr.exceptions.ImageNotFoundException:
+        pass
     except ecr.exceptions.RepositoryNotFoundException:
         print("🔄 ECR repository doesn't exist - will create during build")
     except Exception as e:
@@ -84,7 +288,7 @@ def build_docker_image_if_needed():
     
     # Build using AWS CodeBuild (macOS Mojave compatible)
     try:
-        account_id = boto3.client('sts').get_caller_identity()['Account']
+        account_id = get_account_id()
         build_docker_image_with_codebuild()
         
         # Cleanup old runtime images
@@ -98,24 +302,71 @@ def cleanup_old_images():
     """Remove old runtime images (keep current one)"""
     print("🗑️  Cleaning up old runtime images...")
     try:
-        ecr = boto3.client('ecr', region_name=REGION)
-        images = ecr.list_images(repositoryName=REPOSITORY_NAME)
+        ecr = get_client('ecr')
+        paginator = ecr.get_paginator('list_images')
         
-        current_tag = IMAGE_TAG
+        current_tag = get_image_tag()
         
-        for image in images.get('imageIds', []):
-            if 'imageTag' in image:
-                tag = image['imageTag']
-                # Remove old runtime versions (keep current runtime)
-                if tag.startswith('runtime-') and tag != current_tag:
-                    try:
-                        ecr.batch_delete_image(
-                            repositoryName=REPOSITORY_NAME,
-                            imageIds=[{'imageTag': tag}]
-                        )
-                        print(f"🗑️  Removed old runtime image: {tag}")
-                    except Exception as e:
-                        print(f"⚠️  Could not remove image {tag}: {e}")
+        def stale_images():
+            # Old runtime versions (keep current runtime)
+            for page in paginator.paginate(
+                repositoryName=REPOSITORY_NAME,
+                filter={'tagStatus': 'TAGGED'},
+                PaginationConfig={'PageSize': 1000}
+            ):
+                for image in page.get('imageIds', []):
+                    if image.get('imageTag', '').startswith('runtime-') and image['imageTag'] != current_tag:
+                        yield {'imageTag': image['imageTag']}
+            # Dangling manifests left behind whenever :latest moves to a new build
+            for page in paginator.paginate(
+                repositoryName=REPOSITORY_NAME,
+                filter={'tagStatus': 'UNTAGGED'},
+                PaginationConfig={'PageSize': 1000}
+            ):
+                for image in page.get('imageIds', []):
+                    yield {'imageDigest': image['imageDigest']}
+        
+        def delete_chunk(chunk):
+            try:
+                return chunk, ecr.batch_delete_image(
+                    repositoryName=REPOSITORY_NAME,
+                    imageIds=chunk
+                ), None
+            except Exception as e:
+                return chunk, None, e
+        
+        def describe(image):
+            return image.get('imageTag') or image.get('imageDigest', '')[:19]
+        
+        def report(future):
+            chunk, response, error = future.result()
+            if error is not None:
+                print(f"⚠️  Could not remove images {[describe(image) for image in chunk]}: {error}")
+                return
+            for image in response.get('imageIds', []):
+                if image.get('imageTag'):
+                    print(f"🗑️  Removed old runtime image: {image['imageTag']}")
+            untagged = sum(1 for image in response.get('imageIds', []) if not image.get('imageTag'))
+            if untagged:
+                print(f"🗑️  Removed {untagged} untagged image(s)")
+            for failure in response.get('failures', []):
+                print(f"⚠️  Could not remove image {describe(failure.get('imageId', {}))}: {failure.get('failureReason')}")
+        
+        # batch_delete_image accepts at most 100 image ids per call; chunks are
+        # deleted concurrently while later pages are still being listed
+        from concurrent.futures import ThreadPoolExecutor
+        futures = []
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            chunk = []
+            for image in stale_images():
+                chunk.append(image)
+                if len(chunk) == ECR_BATCH_DELETE_SIZE:
+                    futures.append(pool.submit(delete_chunk, chunk))
+                    chunk = []
+            if chunk:
+                futures.append(pool.submit(delete_chunk, chunk))
+        for future in futures:
+            report(future)
     except Exception as e:
         print(f"⚠️  Runtime cleanup error: {e}")
 
@@ -123,28 +374,93 @@ def build_docker_image_with_codebuild():
     """Build Docker image using AWS CodeBuild"""
     print("🔄 Using AWS CodeBuild to build Docker image...")
     
+    import io
     import zipfile
-    import tempfile
     
     # Create CodeBuild project
-    codebuild = boto3.client('codebuild', region_name=REGION)
-    s3 = boto3.client('s3', region_name=REGION)
-    account_id = boto3.client('sts').get_caller_identity()['Account']
+    codebuild = get_client('codebuild')
+    s3 = get_client('s3')
+    account_id = get_account_id()
     
     project_name = f"ai-executor-ec2-build-{random.randint(1000, 9999)}"
     bucket_name = f"ai-executor-ec2-build-{account_id}-{random.randint(1000, 9999)}"
     
-    # Create S3 bucket for source
-    try:
-        s3.create_bucket(Bucket=bucket_name)
-        print(f"✅ S3 bucket '{bucket_name}' created")
-    except Exception as e:
-        print(f"❌ S3 bucket creation failed: {e}")
-        sys.exit(1)
+    # The source bucket and the service role don't depend on each other or on
+    # the build context, so set them up while the zip is being written
+    from concurrent.futures import ThreadPoolExecutor
+    prep_pool = ThreadPoolExecutor(max_workers=2)
+    bucket_future = prep_pool.submit(s3.create_bucket, Bucket=bucket_name)
+    role_future = prep_pool.submit(create_codebuild_service_role)
+    prep_pool.shutdown(wait=False)
+    
+    project_created = False
+    event_queue = None
+    build_id = None
+    tail = None
+    
+    def empty_and_delete_bucket():
+        # Batch-delete everything in the bucket (not just source.zip), 1000
+        # keys per call, so delete_bucket can't fail on leftovers
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket_name):
+            keys = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+            if keys:
+                s3.delete_objects(Bucket=bucket_name, Delete={'Objects': keys, 'Quiet': True})
+        s3.delete_bucket(Bucket=bucket_name)
+    
+    def remove_build_resources():
+        """Delete the source bucket, the project and the build event routing"""
+        # None of these depend on each other (the queue and the rule included),
+        # so remove them together and report each failure on its own
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            cleanups = {pool.submit(empty_and_delete_bucket): "build bucket"}
+            if project_created:
+                cleanups[pool.submit(codebuild.delete_project, name=project_name)] = "CodeBuild project"
+            if event_queue:
+                # delete_build_event_queue swallows its own errors
+                pool.submit(delete_build_event_queue, event_queue[0], None)
+                pool.submit(delete_build_event_queue, None, event_queue[1])
+            cleaned = True
+            for future in as_completed(cleanups):
+                try:
+                    future.result()
+                except Exception as e:
+                    cleaned = False
+                    print(f"⚠️  Cleanup warning ({cleanups[future]}): {e}")
+        if cleaned:
+            print("✅ Build resources cleaned up")
+    
+    def cancel_build():
+        """Stop the build if it started and remove everything it was using"""
+        if tail is not None:
+            stop_live_tail(tail)
+        if build_id is not None:
+            try:
+                codebuild.stop_build(id=build_id)
+                print(f"🛑 Build stopped: {build_id}")
+            except Exception as e:
+                print(f"⚠️  Could not stop build {build_id}: {e}")
+        try:
+            # The bucket may still be being created
+            bucket_future.result()
+        except Exception:
+            pass
+        remove_build_resources()
+    
+    on_cancel('build', cancel_build)
     
     # Create buildspec for EC2 image
+    # Builds only run for a new runtime tag, so the previous runtime (kept as
+    # :latest) is the layer cache source; its inline cache metadata lets
+    # unchanged layers such as the pip install be reused. BuildKit resolves
+    # --cache-from against the registry and only pulls the layers it reuses,
+    # so there's no up-front pull of the whole previous image
     buildspec = f'''version: 0.2
 
+env:
+  variables:
+    DOCKER_BUILDKIT: "1"
+
 phases:
   pre_build:
     commands:
@@ -161,92 +477,76 @@ phases:
       - echo "Current directory contents:"
       - ls -la
       - echo "Building image with tag:" $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:$IMAGE_TAG
-      - docker build -t $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:$IMAGE_TAG .
+      - docker build --cache-from $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:latest --build-arg BUILDKIT_INLINE_CACHE=1 -t $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:$IMAGE_TAG -t $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:latest .
   post_build:
     commands:
       - echo "Build completed on $(date)"
       - echo "Pushing the Docker image..."
-      - docker push $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME:$IMAGE_TAG
+      - docker push --all-tags $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com/$IMAGE_REPO_NAME
 '''
     
-    # Create zip file with build context
-    with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
-        with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add Dockerfile
-            zip_file.write('ec2-image/Dockerfile', 'Dockerfile')
-            # Add requirements.txt
-            zip_file.write('ec2-image/requirements.txt', 'requirements.txt')
-            # Add buildspec
-            zip_file.writestr('buildspec.yml', buildspec)
-            # Add .env if exists
-            try:
-                zip_file.write('.env', '.env')
-            except FileNotFoundError:
-                print("⚠️  No .env file found")
-        
-        # Upload source to S3
-        s3.upload_file(temp_zip.name, bucket_name, 'source.zip')
-        print("✅ Source code uploaded to S3")
-        
-        # Clean up temp file
-        os.unlink(temp_zip.name)
+    # Create zip file with build context in memory; no temp file to write,
+    # read back and unlink
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        # Add Dockerfile
+        zip_file.write('ec2-image/Dockerfile', 'Dockerfile')
+        # Add requirements.txt
+        zip_file.write('ec2-image/requirements.txt', 'requirements.txt')
+        # Add buildspec
+        zip_file.writestr('buildspec.yml', buildspec)
+        # Add .env if exists
+        try:
+            zip_file.write('.env', '.env')
+        except FileNotFoundError:
+            print("⚠️  No .env file found")
     
-    # Create CodeBuild project
+    # Create S3 bucket for source
     try:
-        codebuild.create_project(
-            name=project_name,
-            source={
-                'type': 'S3',
-                'location': f"{bucket_name}/source.zip"
-            },
-            artifacts={'type': 'NO_ARTIFACTS'},
-            environment={
-                'type': 'LINUX_CONTAINER',
-                'image': 'aws/codebuild/standard:7.0',
-                'computeType': 'BUILD_GENERAL1_MEDIUM',
-                'privilegedMode': True,
-                'environmentVariables': [
-                    {'name': 'AWS_DEFAULT_REGION', 'value': REGION},
-                    {'name': 'AWS_ACCOUNT_ID', 'value': account_id},
-                    {'name': 'IMAGE_REPO_NAME', 'value': REPOSITORY_NAME},
-                    {'name': 'IMAGE_TAG', 'value': IMAGE_TAG}
-                ]
-            },
-            serviceRole=f"arn:aws:iam::{account_id}:role/codebuild-service-role"
-        )
+        bucket_future.result()
+        print(f"✅ S3 bucket '{bucket_name}' created")
+    except Exception as e:
+        print(f"❌ S3 bucket creation failed: {e}")
+        sys.exit(1)
+    
+    # Upload source to S3
+    upload_buffer_to_s3(s3, zip_buffer, bucket_name, 'source.zip')
+    print("✅ Source code uploaded to S3")
+    
+    # Create CodeBuild project once the service role check has finished
+    role_future.result()
+    project_kwargs = dict(
+        name=project_name,
+        source={
+            'type': 'S3',
+            'location': f"{bucket_name}/source.zip"
+        },
+        artifacts={'type': 'NO_ARTIFACTS'},
+        environment={
+            'type': 'LINUX_CONTAINER',
+            'image': 'aws/codebuild/standard:7.0',
+            'computeType': 'BUILD_GENERAL1_MEDIUM',
+            'privilegedMode': True,
+            'environmentVariables': [
+                {'name': 'AWS_DEFAULT_REGION', 'value': REGION},
+                {'name': 'AWS_ACCOUNT_ID', 'value': account_id},
+                {'name': 'IMAGE_REPO_NAME', 'value': REPOSITORY_NAME},
+                {'name': 'IMAGE_TAG', 'value': get_image_tag()}
+            ]
+        },
+        serviceRole=f"arn:aws:iam::{account_id}:role/codebuild-service-role"
+    )
+    try:
+        retry_while_propagating(codebuild.create_project, **project_kwargs)
+        project_created = True
         print(f"✅ CodeBuild project '{project_name}' created")
     except Exception as e:
         print(f"❌ CodeBuild project creation failed: {e}")
-        # Try to create the service role and retry
-        create_codebuild_service_role()
-        print("🔄 Retrying CodeBuild project creation...")
-        
-        try:
-            codebuild.create_project(
-                name=project_name,
-                source={
-                    'type': 'S3',
-                    'location': f"{bucket_name}/source.zip"
-                },
-                artifacts={'type': 'NO_ARTIFACTS'},
-                environment={
-                    'type': 'LINUX_CONTAINER',
-                    'image': 'aws/codebuild/standard:7.0',
-                    'computeType': 'BUILD_GENERAL1_MEDIUM',
-                    'privilegedMode': True,
-                    'environmentVariables': [
-                        {'name': 'AWS_DEFAULT_REGION', 'value': REGION},
-                        {'name': 'AWS_ACCOUNT_ID', 'value': account_id},
-                        {'name': 'IMAGE_REPO_NAME', 'value': REPOSITORY_NAME},
-                        {'name': 'IMAGE_TAG', 'value': IMAGE_TAG}
-                    ]
-                },
-                serviceRole=f"arn:aws:iam::{account_id}:role/codebuild-service-role"
-            )
-            print(f"✅ CodeBuild project '{project_name}' created on retry")
-        except Exception as retry_error:
-            print(f"❌ CodeBuild project creation failed again: {retry_error}")
-            sys.exit(1)
+        sys.exit(1)
+    
+    # Route the build's state changes to a queue before starting it, so no
+    # event is missed; None means polling batch_get_builds instead
+    event_queue = create_build_event_queue(project_name)
     
     # Start build
     try:
@@ -255,79 +555,280 @@ phases:
         print(f"✅ Build started: {build_id}")
     except Exception as e:
         print(f"❌ Build start failed: {e}")
+        if event_queue:
+            delete_build_event_queue(*event_queue)
         sys.exit(1)
     
-    # Monitor build
+    # Monitor build: wait on build events, or back off from 2s to 20s within
+    # each build phase without them. Logs stream from Live Tail in the
+    # background, falling back to polling filter_log_events
+    logs_client = get_client('logs')
+    log_state = {'log_group': f"/aws/codebuild/{project_name}", 'start_time': 0, 'seen': {}}
+    tail = start_live_tail(
+        logs_client,
+        f"arn:aws:logs:{REGION}:{account_id}:log-group:/aws/codebuild/{project_name}",
+        log_state
+    )
+    delay = BUILD_POLL_MIN_DELAY
+    last_phase = None
     while True:
         try:
             build_info = codebuild.batch_get_builds(ids=[build_id])
             status = build_info['builds'][0]['buildStatus']
+            phase = build_info['builds'][0].get('currentPhase')
+            if not tail['active']:
+                stream_build_logs(logs_client, log_state)
             
             if status == 'SUCCEEDED':
+                stop_live_tail(tail)
                 print("✅ Docker image build completed successfully")
                 break
             elif status in ['FAILED', 'FAULT', 'STOPPED', 'TIMED_OUT']:
                 print(f"❌ Build failed with status: {status}")
+                if event_queue:
+                    delete_build_event_queue(*event_queue)
                 
-                # Get build logs for debugging
-                print("🔍 Retrieving build logs...")
-                try:
-                    logs_client = boto3.client('logs', region_name=REGION)
-                    log_group = f"/aws/codebuild/{project_name}"
-                    
-                    # Get log streams
-                    streams = logs_client.describe_log_streams(
-                        logGroupName=log_group,
-                        orderBy='LastEventTime',
-                        descending=True,
-                        limit=1
-                    )
-                    
-                    if streams['logStreams']:
-                        log_stream = streams['logStreams'][0]['logStreamName']
-                        
-                        # Get log events
-                        events = logs_client.get_log_events(
-                            logGroupName=log_group,
-                            logStreamName=log_stream
-                        )
-                        
-                        print("📋 Build logs:")
-                        for event in events['events']:
-                            message = event['message'].strip()
-                            if message:
-                                print(f"   {message}")
-                    else:
-                        print("⚠️  No log streams found")
-                        
-                except Exception as log_error:
-                    print(f"⚠️  Could not retrieve logs: {log_error}")
+                if tail['active']:
+                    # Give Live Tail a moment to deliver the last events
+                    time.sleep(LIVE_TAIL_DRAIN_DELAY)
+                    stop_live_tail(tail)
+                else:
+                    # Pick up log lines published after the last poll
+                    print("🔍 Retrieving remaining build logs...")
+                    stream_build_logs(logs_client, log_state)
                 
                 sys.exit(1)
             else:
-                print(f"🔄 Build status: {status}")
-                time.sleep(30)
+                if phase != last_phase:
+                    # A new phase often means the build is moving quickly
+                    # again (e.g. push right after build), so poll soon
+                    delay = BUILD_POLL_MIN_DELAY
+                    last_phase = phase
+                print(f"🔄 Build status: {status}" + (f" ({phase})" if phase else ""))
+                if event_queue:
+                    # Block until CodeBuild reports a final state, re-checking
+                    # the status every few minutes in case an event goes missing.
+                    # Without Live Tail, wake up at the log poll interval instead
+                    # so stream_build_logs keeps printing the build output
+                    try:
+                        if tail['active']:
+                            wait_for_build_event(event_queue[0], BUILD_EVENT_MAX_WAIT,
+                                                 interrupted=lambda: not tail['active'])
+                        else:
+                            wait_for_build_event(event_queue[0], delay)
+                            delay = min(delay * 1.5, BUILD_POLL_MAX_DELAY)
+                        continue
+                    except Exception as e:
+                        print(f"⚠️  Build events unavailable, polling build status instead: {e}")
+                        delete_build_event_queue(*event_queue)
+                        event_queue = None
+                # Jitter keeps parallel deployers from polling in lockstep
+                time.sleep(delay + random.uniform(0, delay * 0.1))
+                delay = min(delay * 1.5, BUILD_POLL_MAX_DELAY)
         except Exception as e:
+            stop_live_tail(tail)
+            if event_queue:
+                delete_build_event_queue(*event_queue)
             print(f"❌ Build monitoring failed: {e}")
             sys.exit(1)
     
-    # Clean up S3 bucket and CodeBuild project
+    # Clean up S3 bucket, CodeBuild project and build event routing
+    cancel_done('build')
+    remove_build_resources()
+
+def create_build_event_queue(project_name):
+    """Send a CodeBuild project's build state changes to a new SQS queue via EventBridge.
+
+    Returns (queue_url, rule_name), or None if either service can't be set up.
+    """
+    sqs = get_client('sqs')
+    events = get_client('events')
+    queue_url = rule_arn = None
+    rule_name = f"{project_name}-state"
     try:
-        s3.delete_object(Bucket=bucket_name, Key='source.zip')
-        s3.delete_bucket(Bucket=bucket_name)
-        codebuild.delete_project(name=project_name)
-        print("✅ Build resources cleaned up")
+        queue_url = sqs.create_queue(QueueName=project_name)['QueueUrl']
+        queue_arn = sqs.get_queue_attributes(
+            QueueUrl=queue_url,
+            AttributeNames=['QueueArn']
+        )['Attributes']['QueueArn']
+        rule_arn = events.put_rule(
+            Name=rule_name,
+            EventPattern=json.dumps({
+                "source": ["aws.codebuild"],
+                "detail-type": ["CodeBuild Build State Change"],
+                "detail": {"project-name": [project_name]}
+            }),
+            State='ENABLED'
+        )['RuleArn']
+        # Only this rule may deliver to the queue
+        sqs.set_queue_attributes(QueueUrl=queue_url, Attributes={'Policy': json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": {"Service": "events.amazonaws.com"},
+                "Action": "sqs:SendMessage",
+                "Resource": queue_arn,
+                "Condition": {"ArnEquals": {"aws:SourceArn": rule_arn}}
+            }]
+        })})
+        events.put_targets(Rule=rule_name, Targets=[{'Id': 'build-queue', 'Arn': queue_arn}])
+        return queue_url, rule_name
     except Exception as e:
-        print(f"⚠️  Cleanup warning: {e}")
+        print(f"⚠️  Build events unavailable, polling build status instead: {e}")
+        delete_build_event_queue(queue_url, rule_name if rule_arn else None)
+        return None
+
+def delete_build_event_queue(queue_url, rule_name):
+    """Remove the rule and queue made by create_build_event_queue, ignoring failures"""
+    events = get_client('events')
+    steps = []
+    if rule_name:
+        steps.append(lambda: events.remove_targets(Rule=rule_name, Ids=['build-queue']))
+        steps.append(lambda: events.delete_rule(Name=rule_name))
+    if queue_url:
+        steps.append(lambda: get_client('sqs').delete_queue(QueueUrl=queue_url))
+    for step in steps:
+        try:
+            step()
+        except Exception:
+            pass
+
+def wait_for_build_event(queue_url, max_wait, interrupted=None):
+    """Long-poll the build event queue until a final build state arrives or max_wait passes.
+
+    Returns early with None once interrupted() is true, checked between polls.
+    """
+    sqs = get_client('sqs')
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        if interrupted and interrupted():
+            return None
+        # SQS long polls in whole seconds, at most 20
+        wait = min(20, math.ceil(deadline - time.monotonic()))
+        response = sqs.receive_message(QueueUrl=queue_url, WaitTimeSeconds=wait, MaxNumberOfMessages=10)
+        for message in response.get('Messages', []):
+            status = json.loads(message['Body']).get('detail', {}).get('build-status')
+            if status and status != 'IN_PROGRESS':
+                return status
+    return None
+
+def start_live_tail(logs_client, log_group_arn, log_state):
+    """Print build log events from CloudWatch Logs Live Tail in a background thread.
+
+    Returns a dict whose 'active' flag drops to False if the tail stops, so the
+    caller can fall back to stream_build_logs from the last timestamp seen.
+    """
+    tail = {'active': True, 'stop': threading.Event(), 'stream': None}
+    
+    def run():
+        try:
+            while not tail['stop'].is_set():
+                try:
+                    response = logs_client.start_live_tail(logGroupIdentifiers=[log_group_arn])
+                except logs_client.exceptions.ResourceNotFoundException:
+                    # Log group appears once the build container starts
+                    tail['stop'].wait(2)
+                    continue
+                tail['stream'] = response['responseStream']
+                for event in tail['stream']:
+                    if tail['stop'].is_set():
+                        break
+                    for log_event in event.get('sessionUpdate', {}).get('sessionResults', []):
+                        log_state['start_time'] = max(log_state['start_time'], log_event.get('timestamp', 0))
+                        message = log_event.get('message', '').strip()
+                        if message:
+                            print(f"   {message}")
+        except Exception as e:
+            if not tail['stop'].is_set():
+                print(f"⚠️  Live log tail unavailable, polling build logs instead: {e}")
+        finally:
+            tail['active'] = False
+    
+    threading.Thread(target=run, name="build-live-tail", daemon=True).start()
+    return tail
+
+def stop_live_tail(tail):
+    """Stop a Live Tail session started by start_live_tail"""
+    tail['stop'].set()
+    stream = tail['stream']
+    if stream is not None:
+        try:
+            stream.close()
+        except Exception:
+            pass
+
+def stream_build_logs(logs_client, log_state):
+    """Print CodeBuild log events published since the previous call"""
+    try:
+        paginator = logs_client.get_paginator('filter_log_events')
+        for page in paginator.paginate(logGroupName=log_state['log_group'],
+                                       startTime=log_state['start_time']):
+            for event in page.get('events', []):
+                # startTime is inclusive, so skip events already printed
+                if event['eventId'] in log_state['seen']:
+                    continue
+                log_state['seen'][event['eventId']] = event['timestamp']
+                log_state['start_time'] = max(log_state['start_time'], event['timestamp'])
+                message = event['message'].strip()
+                if message:
+                    print(f"   {message}")
+    except logs_client.exceptions.ResourceNotFoundException:
+        # Log group appears once the build container starts
+        return
+    except Exception as log_error:
+        print(f"⚠️  Could not retrieve logs: {log_error}")
+        return
+    
+    # Only ids at the current start time can be returned again
+    log_state['seen'] = {event_id: ts for event_id, ts in log_state['seen'].items()
+                         if ts >= log_state['start_time']}
+
+# (error code, message fragment) pairs AWS returns until a new role or instance profile is usable
+IAM_PROPAGATION_ERRORS = (
+    ('InvalidParameterValue', 'Invalid IAM Instance Profile'),  # EC2 run_instances
+    ('InvalidInputException', 'is not authorized to perform: sts:AssumeRole'),  # CodeBuild create_project
+)
+
+def retry_while_propagating(call, **kwargs):
+    """Call an AWS API, backing off while a new IAM role or instance profile propagates"""
+    from botocore.exceptions import ClientError
+    for attempt in range(IAM_PROPAGATION_RETRIES + 1):
+        try:
+            return call(**kwargs)
+        except ClientError as e:
+            code = e.response['Error'].get('Code')
+            message = e.response['Error'].get('Message', '')
+            propagating = any(code == error_code and fragment in message
+                              for error_code, fragment in IAM_PROPAGATION_ERRORS)
+            if attempt == IAM_PROPAGATION_RETRIES or not propagating:
+                raise
+            delay = 2 ** attempt
+            print(f"⏳ Waiting {delay}s for IAM changes to propagate ({e})")
+            time.sleep(delay)
+
+_CODEBUILD_ROLE_CHECKED = False
+
+def attach_role_policies(iam, role_name, policies):
+    """Attach managed policies to a role concurrently, raising the first failure"""
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(policies)) as pool:
+        futures = [pool.submit(iam.attach_role_policy, RoleName=role_name, PolicyArn=policy) for policy in policies]
+        for future in futures:
+            future.result()
 
 def create_codebuild_service_role():
-    """Create CodeBuild service role if it doesn't exist"""
-    iam = boto3.client('iam')
-    account_id = boto3.client('sts').get_caller_identity()['Account']
+    """Create CodeBuild service role if it doesn't exist (checked once per run)"""
+    global _CODEBUILD_ROLE_CHECKED
+    if _CODEBUILD_ROLE_CHECKED:
+        return
+    
+    iam = get_client('iam')
+    account_id = get_account_id()
     role_name = "codebuild-service-role"
     
     try:
         iam.get_role(RoleName=role_name)
+        _CODEBUILD_ROLE_CHECKED = True
         print(f"✅ CodeBuild service role already exists")
         return
     except iam.exceptions.NoSuchEntityException:
@@ -359,18 +860,20 @@ def create_codebuild_service_role():
             "arn:aws:iam::aws:policy/AmazonS3ReadOnlyAccess"
         ]
         
-        for policy in policies:
-            iam.attach_role_policy(RoleName=role_name, PolicyArn=policy)
+        attach_role_policies(iam, role_name, policies)
         
+        # CodeBuild may take a few more seconds to see the role; create_project
+        # retries through that instead of a fixed sleep here
+        iam.get_waiter('role_exists').wait(RoleName=role_name, WaiterConfig={'Delay': 1, 'MaxAttempts': 20})
         print(f"✅ CodeBuild service role created")
-        time.sleep(10)
+        _CODEBUILD_ROLE_CHECKED = True
         
     except Exception as e:
         print(f"❌ CodeBuild service role creation failed: {e}")
 
 def create_iam_role():
     """Create IAM role for EC2 instance"""
-    iam = boto3.client('iam')
+    iam = get_client('iam')
     role_name = "ai-executor-ec2-role"
     
     # Check if role exists
@@ -410,21 +913,30 @@ def create_iam_role():
             "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly"
         ]
         
-        for policy in policies:
-            iam.attach_role_policy(RoleName=role_name, PolicyArn=policy)
-        
-        # Create instance profile
-        try:
-            iam.create_instance_profile(InstanceProfileName=role_name)
-            iam.add_role_to_instance_profile(
-                InstanceProfileName=role_name,
-                RoleName=role_name
-            )
-        except iam.exceptions.EntityAlreadyExistsException:
-            pass
+        # The instance profile doesn't need the policies, so create it while
+        # they attach
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            attached = pool.submit(attach_role_policies, iam, role_name, policies)
+            
+            # Create instance profile
+            try:
+                iam.create_instance_profile(InstanceProfileName=role_name)
+                iam.add_role_to_instance_profile(
+                    InstanceProfileName=role_name,
+                    RoleName=role_name
+                )
+            except iam.exceptions.EntityAlreadyExistsException:
+                pass
+            attached.result()
         
+        # EC2 may take a few more seconds to see the profile; run_instances
+        # retries through that instead of a fixed sleep here
+        iam.get_waiter('instance_profile_exists').wait(
+            InstanceProfileName=role_name,
+            WaiterConfig={'Delay': 1, 'MaxAttempts': 20}
+        )
         print(f"✅ IAM role '{role_name}' created")
-        time.sleep(10)  # Wait for role to propagate
         return role_name
         
     except Exception as e:
@@ -434,41 +946,45 @@ def create_iam_role():
 
 def upload_files_to_s3(prompt):
     """Upload task prompt, automation script, and scrapers to S3"""
-    s3 = boto3.client('s3', region_name=REGION)
-    account_id = boto3.client('sts').get_caller_identity()['Account']
+    s3 = get_client('s3')
+    account_id = get_account_id()
     bucket_name = f"ai-executor-results-{account_id}"
     task_key = f"{INSTANCE_NAME}-task.txt"
     script_key = f"{INSTANCE_NAME}-automation_task.py"
     scrapers_key = f"{INSTANCE_NAME}-scrapers.zip"
     
     try:
-        # Upload task prompt to S3
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=task_key,
-            Body=prompt.encode('utf-8'),
-            ContentType='text/plain'
-        )
-        print(f"✅ Task prompt uploaded to S3: s3://{bucket_name}/{task_key}")
-        
-        # Upload automation script to S3
-        with open('scripts/automation_task.py', 'r') as f:
-            automation_script = f.read()
-        
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=script_key,
-            Body=automation_script.encode('utf-8'),
-            ContentType='text/plain'
-        )
-        print(f"✅ Automation script uploaded to S3: s3://{bucket_name}/{script_key}")
-        
-        # Create and upload scrapers zip
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        import io
         import zipfile
-        import tempfile
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-            with zipfile.ZipFile(temp_zip.name, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # The three objects are independent, so upload them concurrently
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            # Upload task prompt to S3
+            uploads = {pool.submit(
+                s3.put_object,
+                Bucket=bucket_name,
+                Key=task_key,
+                Body=prompt.encode('utf-8'),
+                ContentType='text/plain'
+            ): f"✅ Task prompt uploaded to S3: s3://{bucket_name}/{task_key}"}
+            
+            # Upload automation script to S3
+            with open('scripts/automation_task.py', 'rb') as f:
+                automation_script = f.read()
+            
+            uploads[pool.submit(
+                s3.put_object,
+                Bucket=bucket_name,
+                Key=script_key,
+                Body=automation_script,
+                ContentType='text/plain'
+            )] = f"✅ Automation script uploaded to S3: s3://{bucket_name}/{script_key}"
+            
+            # Create the scrapers zip in memory while the other uploads are in
+            # flight; the fastest deflate level is plenty for source files
+            zip_buffer = io.BytesIO()
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
                 # Add all files from scripts/scrapers directory
                 scrapers_dir = 'scripts/scrapers'
                 for root, dirs, files in os.walk(scrapers_dir):
@@ -479,62 +995,125 @@ def upload_files_to_s3(prompt):
                         zipf.write(file_path, arcname)
             
             # Upload zip to S3
-            s3.upload_file(temp_zip.name, bucket_name, scrapers_key)
-            print(f"✅ Scrapers uploaded to S3: s3://{bucket_name}/{scrapers_key}")
+            uploads[pool.submit(
+                upload_buffer_to_s3, s3, zip_buffer, bucket_name, scrapers_key
+            )] = f"✅ Scrapers uploaded to S3: s3://{bucket_name}/{scrapers_key}"
             
-            # Clean up temp file
-            os.unlink(temp_zip.name)
+            for future in as_completed(uploads):
+                future.result()
+                print(uploads[future])
         
         return task_key, script_key, scrapers_key
     except Exception as e:
         print(f"❌ Failed to upload files to S3: {e}")
         sys.exit(1)
 
-def launch_ec2_instance(prompt, scraper=None):
-    """Launch EC2 instance with user data script"""
-    print(f"🔄 Launching EC2 instance '{INSTANCE_NAME}'...")
-    
-    # Upload task prompt, automation script, and scrapers to S3 first
-    task_key, script_key, scrapers_key = upload_files_to_s3(prompt)
-    
-    ec2 = boto3.client('ec2', region_name=REGION)
+# Default VPC, subnet and security group rarely change; cache them per account/region
+NETWORK_CACHE = os.path.expanduser("~/.cache/ai-executor/vpc.json")
+
+def _load_network_cache():
+    """Read the network cache, or {} if missing or unreadable"""
+    try:
+        with open(NETWORK_CACHE, 'r') as f:
+            cached = json.load(f)
+        return cached if isinstance(cached, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_network_cache(cached):
+    """Atomically write the network cache, ignoring failures"""
+    try:
+        os.makedirs(os.path.dirname(NETWORK_CACHE), exist_ok=True)
+        tmp_path = f"{NETWORK_CACHE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, NETWORK_CACHE)
+    except OSError:
+        pass
+
+def get_network_config(ec2):
+    """Return (vpc_id, subnet_id, security_group_id), discovering them only on a cache miss"""
+    cache_key = f"{get_account_id()}:{REGION}"
+    cached = _load_network_cache()
+    entry = cached.get(cache_key)
+    if entry:
+        print(f"✅ Using VPC: {entry['vpc_id']}, Subnet: {entry['subnet_id']} (cached)")
+        return entry['vpc_id'], entry['subnet_id'], entry['security_group_id']
     
-    # Get default VPC and subnet
+    # Get default VPC and subnet: default subnets only exist in the default
+    # VPC and carry its id, so one call finds both
     try:
-        vpcs = ec2.describe_vpcs(Filters=[{'Name': 'isDefault', 'Values': ['true']}])
-        if not vpcs['Vpcs']:
+        subnets = ec2.describe_subnets(Filters=[{'Name': 'default-for-az', 'Values': ['true']}])
+        if not subnets['Subnets']:
             print("❌ No default VPC found")
             sys.exit(1)
         
-        vpc_id = vpcs['Vpcs'][0]['VpcId']
-        subnets = ec2.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])
+        vpc_id = subnets['Subnets'][0]['VpcId']
         subnet_id = subnets['Subnets'][0]['SubnetId']
         print(f"✅ Using VPC: {vpc_id}, Subnet: {subnet_id}")
     except Exception as e:
         print(f"❌ VPC/Subnet discovery failed: {e}")
         sys.exit(1)
     
-    # Create security group (allow outbound only)
+    # Reuse the security group from a previous run, else create it (allow outbound only)
+    from botocore.exceptions import ClientError
+    
+    def find_security_group():
+        groups = ec2.describe_security_groups(Filters=[
+            {'Name': 'group-name', 'Values': [SECURITY_GROUP_NAME]},
+            {'Name': 'vpc-id', 'Values': [vpc_id]}
+        ])['SecurityGroups']
+        return groups[0]['GroupId'] if groups else None
+    
     try:
-        sg_response = ec2.create_security_group(
-            GroupName=f"{INSTANCE_NAME}-sg",
-            Description="AI Executor security group - outbound only",
-            VpcId=vpc_id
-        )
-        security_group_id = sg_response['GroupId']
-        print(f"✅ Security group created: {security_group_id}")
+        security_group_id = find_security_group()
+        if security_group_id:
+            print(f"✅ Using existing security group: {security_group_id}")
+        else:
+            try:
+                sg_response = ec2.create_security_group(
+                    GroupName=SECURITY_GROUP_NAME,
+                    Description="AI Executor security group - outbound only",
+                    VpcId=vpc_id
+                )
+                security_group_id = sg_response['GroupId']
+                print(f"✅ Security group created: {security_group_id}")
+            except ClientError as e:
+                # A concurrent first run created it between our lookup and create
+                if e.response['Error']['Code'] != 'InvalidGroup.Duplicate':
+                    raise
+                security_group_id = find_security_group()
+                if not security_group_id:
+                    raise
+                print(f"✅ Using existing security group: {security_group_id}")
     except Exception as e:
         print(f"❌ Security group creation failed: {e}")
         sys.exit(1)
     
-    # Launch instance
-    try:
-        # Read the user data script
-        with open('scripts/user_data.sh', 'r') as f:
-            user_data = f.read()
-        
-        # Replace the placeholder with auto-shutdown and S3 download of automation script
-        script_replacement = f'''# Schedule automatic shutdown after 3 days (259200 seconds) as safety backup
+    cached[cache_key] = {'vpc_id': vpc_id, 'subnet_id': subnet_id, 'security_group_id': security_group_id}
+    _save_network_cache(cached)
+    return vpc_id, subnet_id, security_group_id
+
+def forget_network_config():
+    """Drop this account/region from the network cache"""
+    cached = _load_network_cache()
+    if cached.pop(f"{get_account_id()}:{REGION}", None) is not None:
+        _save_network_cache(cached)
+
+@functools.lru_cache(maxsize=1)
+def _user_data_template():
+    """user_data.sh as raw bytes, split around the automation placeholder"""
+    with open('scripts/user_data.sh', 'rb') as f:
+        head, _, tail = f.read().partition(b'# AUTOMATION_SCRIPT_PLACEHOLDER')
+    return head, tail
+
+@functools.lru_cache(maxsize=8)
+def _render_user_data(script_key):
+    """Gzipped user data script for a launch, rendered once per automation script key"""
+    import gzip
+    
+    # Replace the placeholder with auto-shutdown and S3 download of automation script
+    script_replacement = f'''# Schedule automatic shutdown after 3 days (259200 seconds) as safety backup
 echo "⏰ Scheduling automatic shutdown in 3 days as safety backup..."
 (sleep 259200; echo "🛑 Auto-shutdown timeout reached - terminating instance"; shutdown -h now) &
 AUTO_SHUTDOWN_PID=$!
@@ -549,23 +1128,45 @@ if [ $? -eq 0 ]; then
 else
     echo "❌ Failed to download automation script from S3"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=automation_script_download_failed" 2>/dev/null || true
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     exit 1
 fi'''
+    
+    # Splice bytes directly so only the small replacement needs encoding
+    head, tail = _user_data_template()
+    user_data = b''.join((head, script_replacement.encode(), tail))
+    
+    # cloud-init recognises gzipped user data, which keeps the script well
+    # under the 16 KB UserData limit; run_instances base64-encodes the bytes
+    return gzip.compress(user_data, mtime=0)
+
+def launch_ec2_instance(prompt, task_id, scraper=None):
+    """Launch EC2 instance with user data script"""
+    print(f"🔄 Launching EC2 instance '{INSTANCE_NAME}'...")
+    
+    ec2 = get_client('ec2')
+    
+    # Upload task prompt, automation script, and scrapers to S3 while the
+    # network is looked up; neither depends on the other
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        network_future = pool.submit(get_network_config, ec2)
+        task_key, script_key, scrapers_key = upload_files_to_s3(prompt)
+        vpc_id, subnet_id, security_group_id = network_future.result()
+    
+    # Launch instance
+    try:
+        user_data = _render_user_data(script_key)
         
-        user_data = user_data.replace('# AUTOMATION_SCRIPT_PLACEHOLDER', script_replacement)
-        
-        print(f"🔍 DEBUG: IMAGE_TAG = '{IMAGE_TAG}'")
+        print(f"🔍 DEBUG: IMAGE_TAG = '{get_image_tag()}'")
         
-        response = ec2.run_instances(
+        # Until run_instances returns the id, find the instance by its tag
+        on_cancel('instance', lambda: terminate_instances(ec2, task_id=task_id))
+        launch_kwargs = dict(
             ImageId='ami-0e2c8caa4b6378d8c',  # Ubuntu 24.04 LTS (us-east-1)
             MinCount=1,
             MaxCount=1,
             InstanceType=INSTANCE_TYPE,
-            SecurityGroupIds=[security_group_id],
-            SubnetId=subnet_id,
             UserData=user_data,
             IamInstanceProfile={'Name': 'ai-executor-ec2-role'},
             InstanceInitiatedShutdownBehavior='terminate',
@@ -587,13 +1188,32 @@ fi'''
                     {'Key': 'SCRIPT_KEY', 'Value': script_key},
                     {'Key': 'SCRAPERS_KEY', 'Value': scrapers_key},
                     {'Key': 'INSTANCE_NAME', 'Value': INSTANCE_NAME},
-                    {'Key': 'IMAGE_TAG', 'Value': IMAGE_TAG},
+                    {'Key': 'IMAGE_TAG', 'Value': get_image_tag()},
                     {'Key': 'SCRAPER', 'Value': scraper or ''},
                 ]
             }]
         )
         
+        from botocore.exceptions import ClientError
+        for attempt in range(2):
+            try:
+                response = retry_while_propagating(
+                    ec2.run_instances,
+                    SecurityGroupIds=[security_group_id],
+                    SubnetId=subnet_id,
+                    **launch_kwargs
+                )
+                break
+            except ClientError as e:
+                if attempt or not e.response['Error']['Code'].startswith(('InvalidSubnet', 'InvalidGroup', 'InvalidVpc')):
+                    raise
+                # Cached network resources were deleted: rediscover them and retry once
+                print(f"⚠️  Cached network configuration is stale ({e}) - rediscovering")
+                forget_network_config()
+                vpc_id, subnet_id, security_group_id = get_network_config(ec2)
+        
         instance_id = response['Instances'][0]['InstanceId']
+        on_cancel('instance', lambda: terminate_instances(ec2, instance_ids=[instance_id]))
         print(f"✅ EC2 instance launched: {instance_id}")
         return instance_id
         
@@ -601,203 +1221,353 @@ fi'''
         print(f"❌ EC2 launch failed: {e}")
         sys.exit(1)
 
+def print_result_summary(result):
+    """Print the headline fields of a task result; the full result is in the task file"""
+    print(f"   Status: {result.get('status', 'unknown')}")
+    print(f"   Task: {result.get('task', 'unknown')}")
+    if result.get('result'):
+        print(f"   Result: {result['result']}")
+    if result.get('final_url'):
+        print(f"   Final URL: {result['final_url']}")
+    if result.get('error'):
+        print(f"   Error: {result['error']}")
+
 def monitor_instance_and_get_results(instance_id, task_id):
     """Monitor ACTUAL EC2 instance status and console output"""
+    import gzip
+    from botocore.exceptions import ClientError, WaiterError
     print(f"⏳ Monitoring EC2 instance {instance_id} directly...")
     
-    ec2 = boto3.client('ec2', region_name=REGION)
-    s3 = boto3.client('s3', region_name=REGION)
+    ec2 = get_client('ec2')
+    s3 = get_client('s3')
+    results_s3 = get_results_client()
     
-    account_id = boto3.client('sts').get_caller_identity()['Account']
+    account_id = get_account_id()
     results_bucket = f"ai-executor-results-{account_id}"
     result_key = f"{task_id}-result.json"
     
-    start_time = time.time()
+    # Monotonic clock: the schedule below must not skip or bunch up checks if
+    # the wall clock is adjusted during a multi-day run
+    start_time = time.monotonic()
     timeout = 259200  # 3 days timeout (same as auto-shutdown)
-    last_console_length = 0
+    log_offset = 0
+    saved_hotlink = None
+    status_checks_done = False
+    log_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    log_partial_line = ""
     
-    print("📋 EC2 Instance Status:")
+    # Results are checked on their own schedule: backing off while the task
+    # runs, and every couple of seconds once the log says one is on its way
+    result_interval = RESULT_POLL_MIN_DELAY
+    next_result_check = start_time
+    results_imminent = False
+    
+    logs_bucket = f"ai-executor-logs-{account_id}"
+    log_key = f"{INSTANCE_NAME}.log"
+    last_state = None
+    consecutive_errors = 0
+    # Resolved once instead of on every poll: botocore builds exception
+    # classes lazily behind the attribute lookup
+    no_such_key = s3.exceptions.NoSuchKey
+    task_file = get_task_file(task_id)
     
-    while time.time() - start_time < timeout:
+    def fetch_log():
+        """Bytes appended to the instance log since the last poll"""
         try:
-            # Get ACTUAL instance status
-            instances = ec2.describe_instances(InstanceIds=[instance_id])
-            instance = instances['Reservations'][0]['Instances'][0]
-            state = instance['State']['Name']
-            
-            # Get system status checks
+            response = s3.get_object(Bucket=logs_bucket, Key=log_key, Range=f"bytes={log_offset}-")
+            return response['Body'].read()
+        except no_such_key:
+            # Log file doesn't exist yet - normal during startup
+            return b""
+        except ClientError as e:
+            # Nothing new past the offset yet
+            if e.response.get('Error', {}).get('Code') != 'InvalidRange':
+                raise
+            return b""
+    
+    def fetch_result():
+        """Download and parse the result, hedging a slow GET with a second one"""
+        def get():
+            response = results_s3.get_object(Bucket=results_bucket, Key=result_key)
+            body = read_body(response)
+            # Instances upload the result gzipped; botocore doesn't decode it
+            if response.get('ContentEncoding') == 'gzip':
+                body = gzip.decompress(body)
+            return orjson.loads(body)
+        
+        futures = [pool.submit(get)]
+        done, _ = wait(futures, timeout=RESULT_HEDGE_DELAY)
+        if not done:
+            futures.append(pool.submit(get))
+        error = None
+        for future in as_completed(futures):
             try:
-                status_response = ec2.describe_instance_status(InstanceIds=[instance_id])
-                system_status = "initializing"
-                instance_status = "initializing"
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
+    
+    def poll_result():
+        """The parsed result if it has been uploaded, else None"""
+        try:
+            return fetch_result()
+        except Exception:
+            # No results yet (NoSuchKey), or an S3 error not worth spamming
+            return None
+    
+    print("📋 EC2 Instance Status:")
+    
+    # The per-poll reads are independent, so issue them concurrently
+    from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        while time.monotonic() - start_time < timeout:
+            try:
+                instance_future = pool.submit(ec2.describe_instances, InstanceIds=[instance_id])
+                status_future = None
+                if not status_checks_done:
+                    status_future = pool.submit(ec2.describe_instance_status, InstanceIds=[instance_id])
+                log_future = pool.submit(fetch_log)
                 
-                if status_response['InstanceStatuses']:
-                    status = status_response['InstanceStatuses'][0]
-                    system_status = status['SystemStatus']['Status']
-                    instance_status = status['InstanceStatus']['Status']
+                # Check for results only when the schedule says so
+                result_future = None
+                now = time.monotonic()
+                # Long-running tasks are unlikely to finish any minute now, so
+                # poll them rarely until the log says a result is coming
+                if now - start_time < MONITOR_SLOW_AFTER:
+                    max_delay, result_max_delay = MONITOR_POLL_DELAY, RESULT_POLL_MAX_DELAY
+                else:
+                    max_delay = result_max_delay = MONITOR_POLL_SLOW_DELAY
+                if last_state == 'running' and now >= next_result_check:
+                    next_result_check = now + result_interval
+                    if not results_imminent:
+                        result_interval = min(result_interval * 2, result_max_delay)
+                    result_future = pool.submit(poll_result)
                 
-                print(f"   State: {state} | System: {system_status} | Instance: {instance_status}")
-            except:
-                print(f"   State: {state} | Status checks not available yet")
-            
-            # Stream real-time logs from S3
-            if state == 'running':
-                try:
-                    logs_bucket = f"ai-executor-logs-{account_id}"
-                    log_key = f"{INSTANCE_NAME}.log"
-                    
+                # Get ACTUAL instance status
+                instances = instance_future.result()
+                instance = instances['Reservations'][0]['Instances'][0]
+                state = instance['State']['Name']
+                last_state = state
+                consecutive_errors = 0
+                
+                # Get system status checks; once both pass they stay ok, so stop asking
+                if status_checks_done:
+                    print(f"   State: {state} | System: ok | Instance: ok")
+                else:
                     try:
-                        response = s3.get_object(Bucket=logs_bucket, Key=log_key)
-                        current_log = response['Body'].read().decode()
+                        status_response = status_future.result()
+                        system_status = "initializing"
+                        instance_status = "initializing"
                         
-                        # Only show NEW log content
-                        if len(current_log) > last_console_length:
-                            new_log = current_log[last_console_length:]
-                            if new_log.strip():
-                                lines = new_log.strip().split('\n')
-                                for line in lines:
-                                    if line.strip():
-                                        print(f"📋 {line}")
-                                        
-                                        # Detect browser-use hotlink URL
-                                        if "https://cloud.browser-use.com/hotlink?user_code=" in line:
-                                            import re
-                                            url_match = re.search(r'https://cloud\.browser-use\.com/hotlink\?user_code=[A-Z0-9]+', line)
-                                            if url_match:
-                                                hotlink_url = url_match.group()
-                                                print(f"🔗 Detected browser hotlink: {hotlink_url}")
-                                                
-                                                # Save hotlink to task JSON
+                        if status_response['InstanceStatuses']:
+                            status = status_response['InstanceStatuses'][0]
+                            system_status = status['SystemStatus']['Status']
+                            instance_status = status['InstanceStatus']['Status']
+                        
+                        status_checks_done = system_status == 'ok' and instance_status == 'ok'
+                        print(f"   State: {state} | System: {system_status} | Instance: {instance_status}")
+                    except Exception:
+                        print(f"   State: {state} | Status checks not available yet")
+                
+                # Stream real-time logs from S3
+                try:
+                    # Only fetch the bytes appended since the last poll
+                    chunk = log_future.result()
+                    
+                    # Only show NEW log content, and only once the instance is running
+                    if chunk and state == 'running':
+                        log_offset += len(chunk)
+                        # Incremental decoder keeps multi-byte characters
+                        # split across two fetches intact
+                        new_log = log_decoder.decode(chunk)
+                        # A line cut off at the end of the upload is held back
+                        # until the rest of it arrives, so it's printed (and
+                        # scanned for markers and hotlinks) whole
+                        lines = (log_partial_line + new_log).split('\n')
+                        log_partial_line = lines.pop()
+                        if lines:
+                            # Collect this poll's output and write it in one go
+                            out = []
+                            for line in lines:
+                                if line.strip():
+                                    out.append(f"📋 {line}")
+                                    
+                                    if not results_imminent and any(marker in line for marker in RESULT_MARKERS):
+                                        results_imminent = True
+                                        result_interval = RESULT_POLL_IMMINENT_DELAY
+                                        next_result_check = time.monotonic()
+                                    
+                                    # Detect browser-use hotlink URL
+                                    if "cloud.browser-use.com/hotlink?user_code=" in line:
+                                        url_match = HOTLINK_RE.search(line)
+                                        if url_match:
+                                            hotlink_url = url_match.group()
+                                            out.append(f"🔗 Detected browser hotlink: {hotlink_url}")
+                                            
+                                            # Save hotlink to task JSON, once per distinct link
+                                            if hotlink_url != saved_hotlink:
                                                 try:
-                                                    task_file = f"results/{task_id}.json"
-                                                    if os.path.exists(task_file):
-                                                        with open(task_file, 'r') as f:
-                                                            task_data = json.load(f)
-                                                        
-                                                        task_data["browser_hotlink"] = hotlink_url
-                                                        
-                                                        with open(task_file, 'w') as f:
-                                                            json.dump(task_data, f, indent=2)
-                                                        
-                                                        print(f"💾 Browser hotlink saved to task file")
+                                                    if update_task_file(task_id, browser_hotlink=hotlink_url):
+                                                        saved_hotlink = hotlink_url
+                                                        out.append(f"💾 Browser hotlink saved to task file")
                                                 except Exception as save_error:
-                                                    print(f"⚠️  Could not save hotlink: {save_error}")
-                                        
-                            last_console_length = len(current_log)
+                                                    out.append(f"⚠️  Could not save hotlink: {save_error}")
                             
-                    except s3.exceptions.NoSuchKey:
-                        # Log file doesn't exist yet - normal during startup
-                        pass
+                            if out:
+                                sys.stdout.write("\n".join(out) + "\n")
+                                sys.stdout.flush()
                         
                 except Exception as e:
                     # Don't spam errors for missing logs during startup
-                    if 'NoSuchBucket' not in str(e):
+                    if state == 'running' and 'NoSuchBucket' not in str(e):
                         print(f"   ⚠️  Log streaming error: {e}")
-            
-            # Check for results only occasionally to avoid spam
-            if state == 'running' and (time.time() - start_time) % 60 < 30:  # Check every other cycle
-                try:
-                    s3.head_object(Bucket=results_bucket, Key=result_key)
-                    print("\n✅ Results found in S3!")
-                    
-                    # Download and display results
-                    response = s3.get_object(Bucket=results_bucket, Key=result_key)
-                    result = json.loads(response['Body'].read().decode())
-                    
-                    print("\n📋 Final Task Results:")
-                    print(f"   Status: {result.get('status', 'unknown')}")
-                    print(f"   Task: {result.get('task', 'unknown')}")
-                    if result.get('result'):
-                        print(f"   Result: {result['result']}")
-                    if result.get('final_url'):
-                        print(f"   Final URL: {result['final_url']}")
-                    if result.get('error'):
-                        print(f"   Error: {result['error']}")
-                    
-                    # Save full result to local file
-                    result_filename = f"result-{INSTANCE_NAME}.json"
-                    with open(result_filename, 'w') as f:
-                        json.dump(result, f, indent=2)
-                    print(f"💾 Full result saved to: {result_filename}")
-                    
-                    return result
-                    
-                except s3.exceptions.NoSuchKey:
-                    # No results yet - this is normal
-                    pass
-                except Exception:
-                    # Don't spam S3 errors
-                    pass
-            
-            # Check if instance terminated itself
-            if state in ['terminated', 'stopping', 'stopped']:
-                print(f"\n🔄 Instance {state} - getting final console output...")
-                try:
-                    final_console = ec2.get_console_output(InstanceId=instance_id)
-                    if 'Output' in final_console:
-                        final_lines = final_console['Output'].split('\n')
-                        print("📋 Final console output:")
-                        for line in final_lines[-30:]:  # Last 30 lines
-                            if line.strip():
-                                print(f"   {line}")
-                except:
-                    pass
                 
-                # ALWAYS try to get results - wait a bit for upload to complete
-                print("📥 Checking for final results in S3...")
-                for attempt in range(6):  # Try for up to 30 seconds (5s * 6)
+                # A GET that misses is as cheap as a HEAD, so no separate existence check
+                result = result_future.result() if result_future is not None else None
+                if state == 'running' and result is not None:
+                    print("\n✅ Results found in S3!")
                     try:
-                        s3.head_object(Bucket=results_bucket, Key=result_key)
-                        response = s3.get_object(Bucket=results_bucket, Key=result_key)
-                        result = json.loads(response['Body'].read().decode())
+                        # Display results
+                        print("\n📋 Final Task Results:")
+                        print_result_summary(result)
                         
-                        # Load existing task JSON and add results section
-                        os.makedirs("results", exist_ok=True)
-                        result_filename = f"results/{task_id}.json"
+                        # Save full result to local file
+                        result_filename = f"result-{INSTANCE_NAME}.json"
+                        with open(result_filename, 'wb') as f:
+                            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+                        print(f"💾 Full result saved to: {result_filename}")
                         
-                        # Load existing task data
-                        task_data = {}
-                        if os.path.exists(result_filename):
-                            with open(result_filename, 'r') as f:
-                                task_data = json.load(f)
+                        return result
                         
-                        # Add the automation results
-                        task_data["automation_result"] = result
+                    except Exception:
+                        # Don't spam S3 errors
+                        pass
+                
+                # Check if instance terminated itself
+                if state in ['terminated', 'shutting-down', 'stopping', 'stopped']:
+                    if state in ('shutting-down', 'stopping'):
+                        # Let the shutdown finish before the one console fetch,
+                        # so the tail includes the last lines
+                        waiter_name = 'instance_terminated' if state == 'shutting-down' else 'instance_stopped'
+                        print(f"\n🔄 Instance {state} - waiting for it to finish...")
+                        try:
+                            ec2.get_waiter(waiter_name).wait(
+                                InstanceIds=[instance_id],
+                                WaiterConfig={'Delay': 5, 'MaxAttempts': 24}
+                            )
+                        except WaiterError:
+                            pass
+                    print(f"\n🔄 Instance {state} - getting final console output...")
+                    try:
+                        final_console = ec2.get_console_output(InstanceId=instance_id)
+                        if 'Output' in final_console:
+                            # Only split the end of the buffer, not the whole console
+                            final_lines = final_console['Output'][-CONSOLE_TAIL_CHARS:].split('\n')
+                            # Last 30 lines, written in one go
+                            tail = "".join(f"   {line}\n" for line in final_lines[-30:] if line.strip())
+                            sys.stdout.write("📋 Final console output:\n" + tail)
+                            sys.stdout.flush()
+                    except Exception:
+                        pass
+                    
+                    # ALWAYS try to get results - wait a bit for upload to complete
+                    print("📥 Checking for final results in S3...")
+                    try:
+                        # Up to 30 seconds (5s * 6) for the upload to land
+                        results_s3.get_waiter('object_exists').wait(
+                            Bucket=results_bucket,
+                            Key=result_key,
+                            WaiterConfig={'Delay': 5, 'MaxAttempts': 6}
+                        )
+                    except WaiterError:
+                        print("❌ No result found in S3 after 30 seconds")
+                        return {"status": "error", "error": "Instance terminated without uploading results"}
+                    
+                    try:
+                        result = fetch_result()
                         
-                        # Save updated task data
-                        with open(result_filename, 'w') as f:
-                            json.dump(task_data, f, indent=2)
+                        # Add the automation results to the task JSON
+                        update_task_file(task_id, create=True, automation_result=result)
                         
                         print("✅ Found result in S3!")
-                        print(f"💾 Result saved to: {result_filename}")
-                        print(f"📋 Full result:")
-                        print(json.dumps(result, indent=2))
+                        print(f"💾 Result saved to: {task_file}")
+                        print("📋 Final Task Results:")
+                        print_result_summary(result)
                         
                         return result
-                    except s3.exceptions.NoSuchKey:
-                        if attempt < 5:  # Not the last attempt
-                            print(f"   Attempt {attempt + 1}/6 - waiting for result upload...")
-                            time.sleep(5)
-                        else:
-                            print("❌ No result found in S3 after 30 seconds")
-                            return {"status": "error", "error": "Instance terminated without uploading results"}
                     except Exception as e:
                         print(f"❌ Error checking S3 results: {e}")
                         return {"status": "error", "error": f"S3 error: {str(e)}"}
-            
-            print("-" * 40)
-            time.sleep(30)  # Check every 30 seconds
-            
-        except Exception as e:
-            print(f"⚠️  Error during monitoring: {e}")
-            time.sleep(10)
-    
+                
+                print("-" * 40)
+                # Check every 30 seconds (5 minutes for long tasks), or sooner
+                # when a result check is due; results are only polled once the
+                # instance is running, so until then keep the full interval
+                delay = max_delay
+                if last_state == 'running':
+                    delay = max(1, min(max_delay, next_result_check - time.monotonic()))
+                time.sleep(delay)
+                
+            except Exception as e:
+                # Exponential backoff with jitter, so parallel deployers
+                # don't retry in lockstep during an outage
+                consecutive_errors += 1
+                delay = min(MONITOR_ERROR_MAX_DELAY, 2 ** consecutive_errors) + random.uniform(0, 5)
+                print(f"⚠️  Error during monitoring: {e}")
+                time.sleep(delay)
+        
     print("\n⏰ Timeout reached - task may still be running")
     return {"status": "timeout", "error": "Task timed out after 3 days"}
 
 
+class DeploymentCancelled(BaseException):
+    """Raised in the main thread when app.py cancels the deployment with SIGTERM"""
+
+# Teardown for what a cancelled run would otherwise leave behind (a running
+# instance, a half-finished build), keyed by the resource it cleans up
+_CANCEL_CLEANUPS = {}
+_CANCEL_LOCK = threading.Lock()
+
+def on_cancel(name, cleanup):
+    """Register (or replace) cleanup to run if the deployment is cancelled"""
+    with _CANCEL_LOCK:
+        _CANCEL_CLEANUPS[name] = cleanup
+
+def cancel_done(name):
+    """Drop cleanup registered with on_cancel once it is no longer needed"""
+    with _CANCEL_LOCK:
+        _CANCEL_CLEANUPS.pop(name, None)
+
+def run_cancel_cleanups():
+    """Run registered cancel cleanups, newest first, reporting failures"""
+    with _CANCEL_LOCK:
+        cleanups = list(_CANCEL_CLEANUPS.items())
+        _CANCEL_CLEANUPS.clear()
+    for name, cleanup in reversed(cleanups):
+        try:
+            cleanup()
+        except Exception as e:
+            print(f"⚠️  Cancel cleanup failed ({name}): {e}")
+
+def _raise_cancelled(signum, frame):
+    raise DeploymentCancelled()
+
+def terminate_instances(ec2, instance_ids=None, task_id=None):
+    """Terminate the given instances, or any still alive that carry a task's TASK_ID tag"""
+    if instance_ids is None:
+        response = ec2.describe_instances(Filters=[
+            {'Name': 'tag:TASK_ID', 'Values': [task_id]},
+            {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']}
+        ])
+        instance_ids = [instance['InstanceId'] for reservation in response['Reservations']
+                        for instance in reservation['Instances']]
+    if instance_ids:
+        ec2.terminate_instances(InstanceIds=instance_ids)
+        print(f"🛑 Terminated instance(s): {', '.join(instance_ids)}")
+
 def main():
     import argparse
+    import signal
     
     parser = argparse.ArgumentParser(description='Deploy EC2 instance for browser automation')
     parser.add_argument('--task', required=True, help='The automation task to perform')
@@ -818,17 +1588,37 @@ def main():
     if scraper:
         print(f"🔧 Scraper: {scraper}")
     
-    check_aws_credentials()
-    build_docker_image_if_needed()
-    role_name = create_iam_role()
-    instance_id = launch_ec2_instance(prompt, scraper)
-    
-    print("\n🚀 EC2 deployment completed!")
-    print(f"📋 Instance ID: {instance_id}")
-    print("⏳ Instance will auto-terminate when task completes")
-    print("📊 Monitoring for results...")
-    
-    result = monitor_instance_and_get_results(instance_id, task_id)
+    # app.py cancels a deployment with SIGTERM; unwind the main thread and
+    # remove whatever was launched instead of leaving it running
+    signal.signal(signal.SIGTERM, _raise_cancelled)
+    try:
+        check_aws_credentials()
+        
+        # The image build and the instance role don't depend on each other.
+        # Not a with block: a cancelled run must not wait for the build
+        from concurrent.futures import ThreadPoolExecutor
+        pool = ThreadPoolExecutor(max_workers=2)
+        image_future = pool.submit(build_docker_image_if_needed)
+        role_future = pool.submit(create_iam_role)
+        image_future.result()
+        role_name = role_future.result()
+        pool.shutdown()
+        instance_id = launch_ec2_instance(prompt, task_id, scraper)
+        
+        print("\n🚀 EC2 deployment completed!")
+        print(f"📋 Instance ID: {instance_id}")
+        print("⏳ Instance will auto-terminate when task completes")
+        print("📊 Monitoring for results...")
+        
+        result = monitor_instance_and_get_results(instance_id, task_id)
+        cancel_done('instance')
+    except DeploymentCancelled:
+        print("\n🛑 Deployment cancelled - cleaning up...")
+        run_cancel_cleanups()
+        print("🛑 Cleanup finished")
+        sys.stdout.flush()
+        # Skip joining worker threads that may still be mid-build or mid-poll
+        os._exit(128 + signal.SIGTERM)
     
     print("\n🎉 Task completed!")
 
@@ -1,4 +1,6 @@
 import asyncio
+import gzip
+import importlib
 import json
 import os
 import boto3
@@ -25,15 +27,6 @@ async def run_task(prompt, instance_name, region, scraper=None):
         logger.info(f"🚀 Starting task: {prompt}")
         logger.info(f"📋 Instance: {instance_name}, Region: {region}")
         
-        # Initialize LLM
-        logger.info("🔧 Initializing LLM...")
-        llm = ChatGoogle(
-            model="gemini-2.5-flash",
-            api_key=os.environ.get("GOOGLE_API_KEY"),
-            temperature=0.1
-        )
-        logger.info("✅ LLM initialized")
-        
         # Debug: Check which browser-use package we're using
         try:
             import browser_use
@@ -42,25 +35,54 @@ async def run_task(prompt, instance_name, region, scraper=None):
         except Exception as e:
             logger.warning(f"⚠️ Could not check browser-use package: {e}")
         
-        # Create browser session for EC2 with Cloudflare bypass (following re-browser-use example exactly)
-        logger.info("🌐 Creating browser session with anti-detection...")
-        from browser_use import BrowserProfile
-        
-        browser_session = BrowserSession(
-            browser_profile=BrowserProfile(
-                headless=False,  # Critical for OS-level clicks to bypass Cloudflare
-                disable_security=False,
-                cross_origin_iframes=True,
-                highlight_elements=True
-            ),
-            keep_alive=False,
-            user_data_dir="/app/chrome-user-data"
+        def create_llm():
+            # Initialize LLM
+            logger.info("🔧 Initializing LLM...")
+            llm = ChatGoogle(
+                model="gemini-2.5-flash",
+                api_key=os.environ.get("GOOGLE_API_KEY"),
+                temperature=0.1
+            )
+            logger.info("✅ LLM initialized")
+            return llm
+        
+        async def start_browser():
+            # Create browser session for EC2 with Cloudflare bypass (following re-browser-use example exactly)
+            logger.info("🌐 Creating browser session with anti-detection...")
+            from browser_use import BrowserProfile
+            
+            browser_session = BrowserSession(
+                browser_profile=BrowserProfile(
+                    headless=False,  # Critical for OS-level clicks to bypass Cloudflare
+                    disable_security=False,
+                    cross_origin_iframes=True,
+                    highlight_elements=True
+                ),
+                keep_alive=False,
+                user_data_dir="/app/chrome-user-data"
+            )
+            
+            logger.info("🚀 Starting browser...")
+            await browser_session.start()
+            logger.info("✅ Browser started successfully")
+            return browser_session
+        
+        def import_scraper():
+            # Dynamically import the scraper and find its entry point
+            scraper_module = importlib.import_module(f"scrapers.{scraper}")
+            return getattr(scraper_module, f"run_{scraper}_scraper")
+        
+        # Load the scraper (and Playwright with it) in the background now
+        # rather than after the agent run; failures surface when it's used
+        scraper_future = asyncio.ensure_future(asyncio.to_thread(import_scraper)) if scraper else None
+        
+        # The LLM client and the browser don't depend on each other, so build
+        # the client in a worker thread while Chromium launches
+        llm, browser_session = await asyncio.gather(
+            asyncio.to_thread(create_llm),
+            start_browser()
         )
         
-        logger.info("🚀 Starting browser...")
-        await browser_session.start()
-        logger.info("✅ Browser started successfully")
-        
         # Create agent and run task
         logger.info("🤖 Creating AI agent...")
         agent = Agent(
@@ -91,9 +113,7 @@ async def run_task(prompt, instance_name, region, scraper=None):
         if scraper:
             logger.info(f"🔄 Running scraper: {scraper}")
             try:
-                # Dynamically import and run the scraper
-                scraper_module = __import__(f"scrapers.{scraper}", fromlist=[scraper])
-                run_scraper_func = getattr(scraper_module, f"run_{scraper}_scraper")
+                run_scraper_func = await scraper_future
                 await run_scraper_func(instance_name, region)
                 logger.info(f"✅ Scraper completed")
             except ImportError:
@@ -128,6 +148,19 @@ async def run_task(prompt, instance_name, region, scraper=None):
             "traceback": traceback.format_exc()
         }
 
+def log_peak_memory():
+    """Log the container's peak memory against the host's, as a sizing hint for INSTANCE_TYPE"""
+    try:
+        with open("/sys/fs/cgroup/memory.peak") as f:
+            peak_mb = int(f.read()) // (1024 * 1024)
+        total_mb = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (OSError, ValueError):
+        # cgroup v1 or an older kernel without memory.peak
+        return
+    logger.info(f"📊 Peak memory: {peak_mb} MB of {total_mb} MB")
+    if peak_mb < total_mb * 0.5:
+        logger.info("💡 Task used under half the instance memory - a smaller INSTANCE_TYPE may do")
+
 if __name__ == "__main__":
     import argparse
     
@@ -169,21 +202,36 @@ if __name__ == "__main__":
             "traceback": traceback.format_exc()
         }
     
+    log_peak_memory()
+    
     # ALWAYS save and upload result
     logger.info("💾 Saving result to file...")
+    result_json = json.dumps(result, indent=2)
     with open("/tmp/result.json", "w") as f:
-        json.dump(result, f, indent=2)
+        f.write(result_json)
     
     # ALWAYS upload result to S3 - no matter what happened
     logger.info("📤 Uploading result to S3...")
     try:
-        import boto3
-        s3 = boto3.client('s3')
-        account_id = boto3.client('sts').get_caller_identity()['Account']
-        results_bucket = f"ai-executor-results-{account_id}"
+        # One session for both clients; the host already knows the results
+        # bucket, so STS is only asked when it wasn't passed in
+        session = boto3.session.Session()
+        s3 = session.client('s3')
+        results_bucket = os.environ.get("RESULTS_BUCKET")
+        if not results_bucket:
+            account_id = session.client('sts').get_caller_identity()['Account']
+            results_bucket = f"ai-executor-results-{account_id}"
         result_key = f"{task_id}-result.json"
         
-        s3.upload_file("/tmp/result.json", results_bucket, result_key)
+        # Results carry page text and tracebacks, which compress several
+        # times over; the monitor decodes by ContentEncoding
+        s3.put_object(
+            Bucket=results_bucket,
+            Key=result_key,
+            Body=gzip.compress(result_json.encode()),
+            ContentEncoding='gzip',
+            ContentType='application/json'
+        )
         logger.info(f"✅ Result uploaded to s3://{results_bucket}/{result_key}")
     except Exception as upload_error:
         logger.error(f"❌ Failed to upload result to S3: {upload_error}")
@@ -1,11 +1,53 @@
 #!/usr/bin/env python3
 
-import asyncio
 import logging
 from playwright.async_api import async_playwright
 
 logger = logging.getLogger(__name__)
 
+async def download_via_page(browser, api_url):
+    """
+    Load the API URL in a browser page and return what it shows
+    """
+    # Create a new page
+    page = await browser.new_page()
+    
+    # Navigate to API URL and wait for the endpoint's own successful response
+    # rather than network idle plus a fixed delay; a bot check served first is
+    # simply waited out. Match on the path since the browser may re-encode
+    # the query string
+    logger.info(f"🌐 Navigating to API URL...")
+    endpoint = api_url.split('?', 1)[0]
+    try:
+        async with page.expect_response(
+            lambda r: r.url.startswith(endpoint) and r.status == 200, timeout=30000
+        ) as response_info:
+            await page.goto(api_url, timeout=30000)
+        response = await response_info.value
+        api_content = await response.text()
+        logger.info(f"✅ Downloaded complete content ({len(api_content)} characters) from API endpoint")
+        return api_content
+    except Exception as e:
+        logger.info(f"⚠️ No API response captured ({e}) - reading the page instead")
+    
+    # Get complete page content - no truncation, preserve exactly as browser shows
+    try:
+        # Get the raw body text content (preserves JSON structure)
+        body_text = await page.evaluate("document.body.innerText || document.body.textContent")
+        if body_text:
+            api_content = body_text  # Keep complete content, no stripping
+            logger.info(f"✅ Downloaded complete content ({len(api_content)} characters) from API endpoint")
+        else:
+            # Fall back to full HTML if no body text
+            api_content = await page.content()
+            logger.info(f"✅ Downloaded complete HTML content ({len(api_content)} characters) from API endpoint")
+    except:
+        # Last resort - get all content
+        api_content = await page.content()
+        logger.info(f"✅ Downloaded complete HTML content ({len(api_content)} characters) from API endpoint")
+    
+    return api_content
+
 async def run_insights_scraper(instance_name, region):
     """
     Download content from Udemy Insights API using Playwright with authenticated Chrome user data
@@ -31,32 +73,19 @@ async def run_insights_scraper(instance_name, region):
             )
             
             try:
-                # Create a new page
-                page = await browser.new_page()
-                
-                # Navigate to API URL
-                logger.info(f"🌐 Navigating to API URL...")
-                await page.goto(api_url, wait_until="networkidle", timeout=30000)
-                
-                # Wait a bit more for content to load
-                await asyncio.sleep(3)
-                
-                # Get complete page content - no truncation, preserve exactly as browser shows
-                try:
-                    # Get the raw body text content (preserves JSON structure)
-                    body_text = await page.evaluate("document.body.innerText || document.body.textContent")
-                    if body_text:
-                        api_content = body_text  # Keep complete content, no stripping
-                        logger.info(f"✅ Downloaded complete content ({len(api_content)} characters) from API endpoint")
-                    else:
-                        # Fall back to full HTML if no body text
-                        api_content = await page.content()
-                        logger.info(f"✅ Downloaded complete HTML content ({len(api_content)} characters) from API endpoint")
-                except:
-                    # Last resort - get all content
-                    api_content = await page.content()
-                    logger.info(f"✅ Downloaded complete HTML content ({len(api_content)} characters) from API endpoint")
-                
+                # Request the API directly through the browser context, which
+                # sends the profile's cookies without rendering a page
+                logger.info(f"🌐 Requesting API URL...")
+                response = await browser.request.get(
+                    api_url, headers={"Accept": "application/json"}, timeout=30000
+                )
+                if response.ok:
+                    api_content = await response.text()
+                    logger.info(f"✅ Downloaded complete content ({len(api_content)} characters) from API endpoint")
+                else:
+                    # e.g. a bot check that only a real page load gets past
+                    logger.info(f"⚠️ API request returned {response.status} - loading it in a page instead")
+                    api_content = await download_via_page(browser, api_url)
                 
             finally:
                 # Always close the browser
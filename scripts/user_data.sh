@@ -32,10 +32,32 @@ fi
 
 # Get basic AWS info and environment variables
 echo "🔧 Setting up S3 logging..."
-AWS_ACCOUNT_ID=$(aws sts get-caller-identity --query Account --output text)
+# The instance identity document already names the account, so there's no
+# need for an STS round trip; STS remains the fallback
+AWS_ACCOUNT_ID=$(curl -s http://169.254.169.254/latest/dynamic/instance-identity/document | grep -o '"accountId"[^,]*' | grep -o '[0-9]\{12\}')
+if [ -z "$AWS_ACCOUNT_ID" ]; then
+    AWS_ACCOUNT_ID=$(aws sts get-caller-identity --query Account --output text)
+fi
 LOGS_BUCKET="ai-executor-logs-$AWS_ACCOUNT_ID"
 RESULTS_BUCKET="ai-executor-results-$AWS_ACCOUNT_ID"
 
+# Push the log to S3 one last time and power off, instead of sleeping long
+# enough for the background uploader to come round again
+shutdown_with_final_log() {
+    echo "📤 Uploading final log..."
+    if [ -n "$LOG_UPLOADER_PID" ]; then
+        # Stop the uploader and any copy it has in flight so an older
+        # snapshot can't land after this one
+        kill -STOP $LOG_UPLOADER_PID 2>/dev/null
+        pkill -P $LOG_UPLOADER_PID 2>/dev/null
+        kill -9 $LOG_UPLOADER_PID 2>/dev/null
+        wait $LOG_UPLOADER_PID 2>/dev/null
+    fi
+    sleep 1  # let tee write out the last lines
+    aws s3 cp /tmp/execution.log s3://$LOGS_BUCKET/$INSTANCE_NAME.log --region $REGION >/dev/null 2>&1 || true
+    shutdown -h now
+}
+
 # Get environment variables from EC2 metadata service
 echo "🔍 Loading environment variables from metadata..."
 export GOOGLE_API_KEY=$(curl -s http://169.254.169.254/latest/meta-data/tags/instance/GOOGLE_API_KEY)
@@ -64,9 +86,7 @@ if [ $? -eq 0 ]; then
 else
     echo "❌ Failed to download task prompt from S3"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=task_download_failed" 2>/dev/null || true
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     exit 1
 fi
 
@@ -78,9 +98,7 @@ if [ $? -eq 0 ]; then
 else
     echo "❌ Failed to download automation script from S3"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=script_download_failed" 2>/dev/null || true
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     exit 1
 fi
 
@@ -97,9 +115,7 @@ if [ $? -eq 0 ]; then
 else
     echo "❌ Failed to download scrapers from S3"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=scrapers_download_failed" 2>/dev/null || true
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     exit 1
 fi
 
@@ -121,18 +137,27 @@ else
 fi
 
 # START BACKGROUND LOG UPLOAD AFTER BUCKET IS CREATED
+# Check often but only upload when the log has grown, so new lines reach the
+# monitor sooner and idle stretches cost no S3 requests
 (
     export PATH="/usr/local/bin:/usr/bin:/bin:$PATH"
+    LAST_LOG_SIZE=""
     while true; do
         if [ -f /tmp/execution.log ] && command -v aws >/dev/null 2>&1; then
-            S3_ERROR=$(aws s3 cp /tmp/execution.log s3://$LOGS_BUCKET/$INSTANCE_NAME.log --region $REGION 2>&1)
-            if [ $? -ne 0 ]; then
-                curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=s3_upload_error&error=$S3_ERROR" 2>/dev/null || true
+            LOG_SIZE=$(stat -c %s /tmp/execution.log)
+            if [ "$LOG_SIZE" != "$LAST_LOG_SIZE" ]; then
+                S3_ERROR=$(aws s3 cp /tmp/execution.log s3://$LOGS_BUCKET/$INSTANCE_NAME.log --region $REGION 2>&1)
+                if [ $? -ne 0 ]; then
+                    curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=s3_upload_error&error=$S3_ERROR" 2>/dev/null || true
+                else
+                    LAST_LOG_SIZE=$LOG_SIZE
+                fi
             fi
         fi
-        sleep 30
+        sleep 10
     done
 ) &
+LOG_UPLOADER_PID=$!
 
 echo "✅ S3 logging started - logs will stream to s3://$LOGS_BUCKET/$INSTANCE_NAME.log"
 
@@ -162,9 +187,7 @@ else
     echo "❌ Docker image pull failed"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=docker_pull_failed" 2>/dev/null || true
     echo "🔄 Shutting down instance due to Docker pull failure..."
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     echo "✅ Instance shutdown requested"
     exit 1
 fi
@@ -175,9 +198,7 @@ fi
 if [ ! -f /tmp/automation_task.py ]; then
     echo "❌ ERROR: /tmp/automation_task.py does not exist!"
     echo "🔄 Shutting down instance due to missing script..."
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     exit 1
 fi
 
@@ -206,6 +227,7 @@ docker run --rm \
     -e AWS_SECRET_ACCESS_KEY \
     -e AWS_SESSION_TOKEN \
     -e AWS_DEFAULT_REGION=$REGION \
+    -e RESULTS_BUCKET="$RESULTS_BUCKET" \
     -e DISPLAY=:99 \
     --shm-size=2g \
     $DOCKER_IMAGE sh -c "Xvfb :99 -screen 0 1920x1080x24 & python3 /tmp/automation_task.py ${DOCKER_ARGS[*]}" 2>&1 | while read line; do
@@ -221,9 +243,7 @@ else
     echo "❌ Docker task failed with exit code: $DOCKER_EXIT_CODE"
     curl -X POST http://requestbin.whapi.cloud/1phw2m41 -d "status=docker_failed&exit_code=$DOCKER_EXIT_CODE" 2>/dev/null || true
     echo "🔄 Shutting down instance due to Docker failure..."
-    echo "⏳ Waiting 30 seconds for final log upload..."
-    sleep 30
-    shutdown -h now
+    shutdown_with_final_log
     echo "✅ Instance shutdown requested"
     exit 1
 fi
@@ -244,8 +264,6 @@ echo "🧹 Cleaning up..."
 docker system prune -f
 
 echo "🔄 Shutting down instance..."
-echo "⏳ Waiting 30 seconds for final log upload..."
-sleep 30
-shutdown -h now
+shutdown_with_final_log
 
 echo "✅ Task completed - instance shutting down"
\ No newline at end of file
@@ -0,0 +1,159 @@
+import errno
+import importlib
+import os
+import sys
+import time
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def app_module(tmp_path_factory):
+    """Import app.py with its results/ and logs/ directories in a scratch dir"""
+    workdir = tmp_path_factory.mktemp("app")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    try:
+        module = importlib.import_module("app")
+        # Stand-in for deploy_ai_agent.py: enough output to hit the log file
+        module._CMD_PREFIX = (sys.executable, "-c", "print('x' * 8192)")
+        yield module
+        # Write pending task files while the relative results/ path still applies
+        module.flush_tasks()
+    finally:
+        sys.path.remove(REPO_DIR)
+        os.chdir(cwd)
+
+
+def wait_for_status(module, task_id, statuses, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        task = module.load_task(task_id)
+        if task and task["status"] in statuses:
+            return task
+        time.sleep(0.05)
+    pytest.fail(f"task {task_id} never reached {statuses}: {module.load_task(task_id)}")
+
+
+def launch(client):
+    response = client.post("/launch", json={"prompt": "test"})
+    assert response.status_code == 202
+    return response.get_json()["task_id"]
+
+
+def test_supervisor_survives_log_write_error(app_module, monkeypatch):
+    client = app_module.app.test_client()
+    flush_log = app_module.DeploymentSupervisor._flush_log
+    # The first job to write its log is the one whose disk "fills up"
+    broken = []
+
+    def failing_flush_log(self, job):
+        if not broken:
+            broken.append(job["task_id"])
+        if job["task_id"] in broken:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return flush_log(self, job)
+
+    monkeypatch.setattr(app_module.DeploymentSupervisor, "_flush_log", failing_flush_log)
+
+    first = launch(client)
+    task = wait_for_status(app_module, first, ["failed", "completed"])
+    assert task["status"] == "failed"
+    assert "No space left" in task["error"]
+
+    second = launch(client)
+    task = wait_for_status(app_module, second, ["failed", "completed"])
+    assert task["status"] == "completed"
+    assert task["started_at"] and task["completed_at"]
+    assert app_module.SUPERVISOR.is_alive()
+    assert app_module.SUPERVISOR.running == 0
+
+
+def test_cancelled_task_gets_completed_at(app_module):
+    app_module.save_task("cancel-me", {"id": "cancel-me", "status": "queued", "completed_at": None})
+    app_module.update_task_status("cancel-me", "cancelled")
+    task = app_module.load_task("cancel-me")
+    assert task["status"] == "cancelled"
+    assert task["completed_at"]
+
+
+def test_status_views_order_ties_by_task_id(app_module):
+    client = app_module.app.test_client()
+    for task_id in ["tie-c", "tie-a", "tie-b"]:
+        app_module.save_task(task_id, {"id": task_id, "status": "zz-tied", "scraper": "ties"})
+    view = app_module._SORTED["status"]
+    ids = [t["id"] for t in view if t["status"] == "zz-tied"]
+    assert ids == ["tie-a", "tie-b", "tie-c"]
+
+    # Updating one of several equal-keyed tasks replaces exactly that entry
+    app_module.update_task_status("tie-b", "zz-tied", note="updated")
+    assert len(view) == len(app_module._TASKS)
+    assert [t.get("note") for t in view if t["status"] == "zz-tied"] == [None, "updated", None]
+
+    response = client.get("/status?sort=status&order=desc&per_page=3&scraper=ties")
+    assert [t["id"] for t in response.get_json()["tasks"]] == ["tie-c", "tie-b", "tie-a"]
+
+
+def baseline_description(scraper_file):
+    """The original /scrapers parsing: read the whole file, check its first 10 lines"""
+    description = None
+    try:
+        with open(scraper_file, 'r') as f:
+            content = f.read()
+            lines = content.split('\n')
+            for line in lines[:10]:
+                if '"""' in line or "'''" in line:
+                    description = line.replace('"""', '').replace("'''", '').strip()
+                    break
+                elif line.strip().startswith('#') and len(line.strip()) > 5:
+                    description = line.strip()[1:].strip()
+                    break
+    except Exception:
+        pass
+    return description
+
+
+SCRAPER_SOURCES = {
+    "mid_line": 'import json; """Docstring opened after code"""\n',
+    "comment": "# Collects course reviews from the instructor dashboard\nimport json\n",
+    "short_comment": "#  abc\n'''Single-quoted docstring'''\n",
+    "too_short": "# ab\n\n'''  Padded docstring  '''\n",
+    "bare_quotes": '"""\nDescription on the next line\n"""\n',
+    "shebang": "#!/usr/bin/env python3\n\"\"\"Shebang comes first\"\"\"\n",
+    "crlf": "import os\r\n# Windows line endings here\r\n",
+    "too_far": "\n" * 10 + '"""Past the header"""\n',
+    "empty": "",
+}
+
+
+def test_scraper_descriptions_match_baseline(app_module, tmp_path):
+    for name, source in SCRAPER_SOURCES.items():
+        (tmp_path / f"{name}.py").write_bytes(source.encode())
+    real = os.path.join(REPO_DIR, "scripts", "scrapers", "insights.py")
+    (tmp_path / "insights.py").write_bytes(open(real, 'rb').read())
+
+    scrapers = app_module._list_scrapers(tmp_path)
+    assert len(scrapers) == len(SCRAPER_SOURCES) + 1
+    for scraper in scrapers:
+        expected = baseline_description(scraper["file"]) or f"{scraper['name']} scraper"
+        assert scraper["description"] == expected, scraper["name"]
+
+
+@pytest.mark.parametrize("chunk", [3, 65536])
+def test_task_logs_match_text_mode_read(app_module, monkeypatch, chunk):
+    monkeypatch.setattr(app_module, "LOG_TAIL_CHUNK", chunk)
+    client = app_module.app.test_client()
+    log_file = app_module.LOGS_DIR / "newlines.txt"
+    log_file.write_bytes(b"one\r\ntwo\rthree\nfour\r\n\r\nsix\r\rseven")
+
+    for tail in [0, 1, 2, 3, 5, 100]:
+        # The endpoint used to read the whole file in text mode
+        with open(log_file, 'r') as f:
+            lines = f.readlines()
+        if tail > 0:
+            lines = lines[-tail:]
+        body = client.get(f"/logs/newlines?tail={tail}").get_json()
+        assert (body["lines"], body["content"]) == (len(lines), ''.join(lines)), tail